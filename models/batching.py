@@ -0,0 +1,134 @@
+import asyncio
+import itertools
+import time
+
+import metrics
+import timing
+from config import EMBED_BATCH_WINDOW_MS, EMBED_MAX_BATCH_SIZE, EMBED_MAX_QUEUE
+from inference import Overloaded
+from urgency import most_urgent, schedule_key
+
+
+QUEUE_DEPTH = metrics.gauge(
+    "embedding_batcher_queue_depth",
+    "Symptom texts waiting to be embedded"
+)
+BATCH_SIZE = metrics.histogram(
+    "embedding_batcher_batch_size",
+    "Texts per BERT forward pass",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128]
+)
+WAIT_SECONDS = metrics.histogram(
+    "embedding_batcher_wait_seconds",
+    "Time a text spent queued before its forward pass started",
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces symptom texts from concurrent requests into one forward pass.
+
+    A batch is closed when it reaches max_batch_size or when window_ms has
+    passed since its first text arrived. Waiting texts are taken most urgent
+    first (urgency.schedule_key). The forward pass runs on pool (an
+    InferencePool, at the priority of the batch's most urgent text; the
+    default thread pool if None) so the event loop stays responsive.
+    """
+
+    def __init__(self, engine, window_ms=EMBED_BATCH_WINDOW_MS,
+                 max_batch_size=EMBED_MAX_BATCH_SIZE, max_queue=EMBED_MAX_QUEUE,
+                 pool=None):
+        self.engine = engine
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self.pool = pool
+        self._queue = None
+        self._task = None
+        self._order = itertools.count()   # FIFO among equal keys
+
+    def start(self):
+        """Start the batching loop. Must be called from the running event loop."""
+        self._queue = asyncio.PriorityQueue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def embed(self, text, priority="low"):
+        """Embed one symptom text; returns a (hidden_size,) NumPy vector."""
+        if self._queue.qsize() >= self.max_queue:
+            raise Overloaded("Embedding queue is full")
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.perf_counter()
+        item = (text, future, enqueued, priority)
+        await self._queue.put((schedule_key(priority, enqueued), next(self._order), item))
+        QUEUE_DEPTH.set(self._queue.qsize())
+        vector, spans = await future
+        # The batch's tokenize/encode spans count towards every request in it
+        timing.add(spans)
+        return vector
+
+    async def _collect(self):
+        """Wait for the first text, then gather more until the window closes."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        QUEUE_DEPTH.set(self._queue.qsize())
+        # Drop the sort keys: (text, future, enqueued, priority)
+        return [item for _, _, item in batch]
+
+    def _embed_batch(self, texts):
+        with timing.collecting() as spans:
+            vectors = self.engine.embed(texts).cpu().numpy()
+        return vectors, spans
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(batch))
+            waits = [started - enqueued for _, _, enqueued, _ in batch]
+            for wait in waits:
+                WAIT_SECONDS.observe(wait)
+                timing.record("embed_queue", wait)
+
+            texts = [text for text, _, _, _ in batch]
+            try:
+                if self.pool is not None:
+                    priority = most_urgent(priority for _, _, _, priority in batch)
+                    work = asyncio.wrap_future(
+                        self.pool.submit(self._embed_batch, texts, priority=priority)
+                    )
+                else:
+                    work = loop.run_in_executor(None, self._embed_batch, texts)
+                vectors, spans = await work
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Fan the CLS vectors back out to the waiting requests
+            for (_, future, _, _), vector, wait in zip(batch, vectors, waits):
+                if not future.done():
+                    future.set_result((vector, {"embed_queue": wait, **spans}))
@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import full_model
+from bench_common import write_results
+from bundle import RISK_LABELS
+from cascade import VitalsCascade
+from config import EMBEDDING_BACKEND
+from to_embeddings import create_engine
+
+
+# --------- CONFIG ---------
+TRAIN_CSV = "datase.csv"
+TEST_CSV = "testdata.csv"
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+def load_patients(path):
+    # keep_default_na=False keeps the literal "None" condition as a string
+    frame = pd.read_csv(path, keep_default_na=False)
+    records = frame.drop(columns=["Symptoms", "Risk_Level", "Department"]).to_dict("records")
+    risks = np.array([RISK_LABELS[int(level)] for level in frame["Risk_Level"]])
+    return records, frame["Symptoms"].tolist(), risks, frame["Department"].to_numpy()
+
+
+def run_full(engine, models, records, texts):
+    """Score every patient as its own /predict would (no caches): returns (risks, departments, seconds)."""
+    risks, departments, seconds = [], [], []
+    for record, text in zip(records, texts):
+        start = time.perf_counter()
+        embedding = engine.embed([text]).cpu().numpy()
+        result = full_model.output_batch([record], embedding, models)[0]
+        seconds.append(time.perf_counter() - start)
+        risks.append(result["risk"])
+        departments.append(result["department"])
+    return np.array(risks), np.array(departments), np.array(seconds)
+
+
+def run_cascade(cascade, threshold, engine, models, records, texts):
+    """The same patients through the cascade first; returns (decided mask, elapsed seconds)."""
+    start = time.perf_counter()
+    decided = np.zeros(len(records), dtype=bool)
+    for i, (record, text) in enumerate(zip(records, texts)):
+        if cascade.decide([record], threshold)[0] is not None:
+            decided[i] = True
+            continue
+        embedding = engine.embed([text]).cpu().numpy()
+        full_model.output_batch([record], embedding, models)
+    return decided, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    cascade = VitalsCascade.fit(TRAIN_CSV)
+    models = full_model.load_serving_models()
+    # No embedding cache: every full-pipeline patient pays for its forward pass
+    engine = create_engine(EMBEDDING_BACKEND)
+    engine.warm_up()
+
+    records, texts, true_risk, true_department = load_patients(TEST_CSV)
+    # The cascade's answer for every patient, whatever its confidence
+    answers = cascade.decide(records, 0.0)
+    rule_risk = np.array([answer["risk"] for answer in answers])
+    rule_department = np.array([answer["department"] for answer in answers])
+
+    full_risk, full_department, full_seconds = run_full(engine, models, records, texts)
+    full_throughput = len(records) / full_seconds.sum()
+    full_risk_accuracy = float(np.mean(full_risk == true_risk))
+    full_department_accuracy = float(np.mean(full_department == true_department))
+    print(
+        f"{TEST_CSV}: {len(records)} patients, cascade {cascade.version}, model {models.version}\n"
+        f"full pipeline: risk acc {full_risk_accuracy:.3f}  department acc "
+        f"{full_department_accuracy:.3f}  {full_throughput:7.1f} patients/s"
+    )
+
+    results = {
+        "test_csv": TEST_CSV,
+        "patients": len(records),
+        "cascade_version": cascade.version,
+        "model_version": models.version,
+        "full": {
+            "risk_accuracy": full_risk_accuracy,
+            "department_accuracy": full_department_accuracy,
+            "throughput": full_throughput,
+        },
+        "thresholds": [],
+    }
+    for threshold in THRESHOLDS:
+        decided, elapsed = run_cascade(cascade, threshold, engine, models, records, texts)
+        risk = np.where(decided, rule_risk, full_risk)
+        department = np.where(decided, rule_department, full_department)
+        row = {
+            "threshold": threshold,
+            "short_circuited": float(decided.mean()),
+            "risk_accuracy": float(np.mean(risk == true_risk)),
+            "department_accuracy": float(np.mean(department == true_department)),
+            "throughput": len(records) / elapsed,
+        }
+        if decided.any():
+            # On the short-circuited patients only: the rules against the full models
+            row["subset"] = {
+                "rules_risk_accuracy": float(np.mean(rule_risk[decided] == true_risk[decided])),
+                "model_risk_accuracy": float(np.mean(full_risk[decided] == true_risk[decided])),
+                "rules_department_accuracy": float(
+                    np.mean(rule_department[decided] == true_department[decided])
+                ),
+                "model_department_accuracy": float(
+                    np.mean(full_department[decided] == true_department[decided])
+                ),
+            }
+        row["risk_accuracy_delta"] = row["risk_accuracy"] - full_risk_accuracy
+        row["department_accuracy_delta"] = row["department_accuracy"] - full_department_accuracy
+        row["throughput_gain"] = row["throughput"] / full_throughput
+        results["thresholds"].append(row)
+        print(
+            f"confidence >= {threshold:.2f}: short-circuited {row['short_circuited']:6.1%}  "
+            f"risk acc {row['risk_accuracy']:.3f} ({row['risk_accuracy_delta']:+.3f})  "
+            f"department acc {row['department_accuracy']:.3f} "
+            f"({row['department_accuracy_delta']:+.3f})  "
+            f"{row['throughput']:7.1f} patients/s (x{row['throughput_gain']:.2f})"
+        )
+
+    write_results(results)
@@ -0,0 +1,41 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def time_calls(fn, calls, warm_up=0):
+    """
+    Call fn(*args) for each args in calls and return the per-call latencies in
+    milliseconds, without the first warm_up calls.
+    """
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies[warm_up:])
+
+
+def report(name, latencies, width=40, rows=None):
+    """Print one aligned p50/p95/mean line; rows: batch size, to add the median per row."""
+    line = (
+        f"{name:<{width}} p50={np.percentile(latencies, 50):9.2f} ms  "
+        f"p95={np.percentile(latencies, 95):9.2f} ms  mean={latencies.mean():9.2f} ms"
+    )
+    if rows is not None:
+        line += f"  per row={np.median(latencies) / rows * 1000:8.1f} us"
+    print(line)
+
+
+def write_results(results, path=None):
+    """Write results as JSON to path, by default the script's first argument (nothing without one)."""
+    if path is None:
+        if len(sys.argv) < 2:
+            return
+        path = sys.argv[1]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from bench_common import report, time_calls
+from to_embeddings import EmbeddingEngine
+
+
+# --------- CONFIG ---------
+N_CALLS = 10
+SAMPLE = ["Patient complains of chest discomfort since this morning."]
+
+
+if __name__ == "__main__":
+    # Before: every call loads tokenizer + weights (old get_symptom_embedding)
+    before = time_calls(lambda: EmbeddingEngine().embed(SAMPLE), [()] * N_CALLS)
+
+    # After: one engine per process, created at startup
+    engine = EmbeddingEngine()
+    engine.embed(SAMPLE)   # warm-up
+    after = time_calls(lambda: engine.embed(SAMPLE), [()] * N_CALLS)
+
+    report("reload per call (before)", before, width=28)
+    report("shared engine (after)", after, width=28)
+    print(f"Speed-up (p50): {np.percentile(before, 50) / np.percentile(after, 50):.1f}x")
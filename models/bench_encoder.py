@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import rss_mb
+
+
+# --------- CONFIG ---------
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+BATCH_SIZES = [1, 8, 32]
+N_TEXTS = 256
+
+
+def run_backend(backend):
+    """Benchmark one backend in this process and print a result line per batch size."""
+    from to_embeddings import create_engine
+
+    texts = pd.read_csv("testdata.csv")["Symptoms"].head(N_TEXTS).tolist()
+    before = rss_mb()
+    engine = create_engine(backend)
+    engine.embed(texts[:BATCH_SIZES[-1]])   # warm-up
+    loaded = rss_mb()
+
+    for batch_size in BATCH_SIZES:
+        latencies = []
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            t = time.perf_counter()
+            engine.embed(texts[i:i + batch_size])
+            latencies.append((time.perf_counter() - t) * 1000)
+        throughput = len(texts) / (time.perf_counter() - start)
+        print(
+            f"{backend:<10} batch={batch_size:<3} {throughput:8.1f} texts/s  "
+            f"p50={np.percentile(latencies, 50):7.1f} ms  "
+            f"model RSS={loaded - before:7.1f} MB  total RSS={rss_mb():7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_backend(sys.argv[1])
+    else:
+        # One process per backend so RSS numbers do not include the others
+        for backend in BACKENDS:
+            subprocess.run([sys.executable, __file__, backend], check=True)
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from bench_common import report, time_calls
+from bundle import load_deployed
+from explanation import build_explainer, predict_single_with_explanation
+from features import assemble_features
+from to_embeddings import get_symptom_embedding
+
+
+# --------- CONFIG ---------
+N_REQUESTS = 50
+
+
+def load_sample_features(n_rows):
+    """First n_rows of testdata.csv in the service's feature layout."""
+    testset = pd.read_csv("testdata.csv", keep_default_na=False).head(n_rows)
+    embeddings = get_symptom_embedding(testset["Symptoms"].tolist()).cpu().numpy()
+    return assemble_features(testset, embeddings)
+
+
+def time_per_request(model, X, explainer):
+    return time_calls(
+        lambda row: predict_single_with_explanation(model, row.reshape(1, -1), explainer=explainer),
+        [(row,) for row in X]
+    )
+
+
+if __name__ == "__main__":
+    X = load_sample_features(N_REQUESTS)
+    bundle = load_deployed()
+    models = {
+        "risk (RandomForest)": bundle.risk_model,
+        "department (XGBoost)": bundle.department_model,
+    }
+
+    for name, model in models.items():
+        report(f"{name}, rebuilt", time_per_request(model, X, None), width=46)
+        for backend in ("shap", "fast", "approximate"):
+            for mode in ("full", "structured"):
+                explainer = build_explainer(model, backend=backend, mode=mode)
+                report(f"{name}, {backend}/{mode}", time_per_request(model, X, explainer), width=46)
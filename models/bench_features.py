@@ -0,0 +1,68 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS, allocate, assemble_features
+
+
+# --------- CONFIG ---------
+N_CALLS = 2000
+BATCH_SIZE = 64
+USER_DATA = {
+    "Age": 67,
+    "Gender": "Female",
+    "Blood_Pressure": 162.0,
+    "Heart_Rate": 104.0,
+    "Temperature": 99.4,
+    "Pre-Existing_Conditions": "Hypertension"
+}
+
+
+def legacy_row(user_data, symptom_embedding):
+    """Feature build used by output() before features.py."""
+    data = [
+        user_data["Age"],
+        1 if user_data["Gender"] == "Female" else 0,
+        user_data["Blood_Pressure"],
+        user_data["Heart_Rate"],
+        user_data["Temperature"],
+        0 if user_data["Pre-Existing_Conditions"] == "None" else 1
+    ]
+    data.extend(symptom_embedding.tolist())
+    X_sample = np.array(data).reshape(1, -1)
+    return pd.DataFrame(X_sample, columns=FEATURE_COLUMNS)
+
+
+def measure(name, fn):
+    """Print per-call time and peak traced allocation for fn."""
+    fn()   # warm-up
+    start = time.perf_counter()
+    for _ in range(N_CALLS):
+        fn()
+    per_call_us = (time.perf_counter() - start) / N_CALLS * 1e6
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<36} {per_call_us:9.1f} us/call   peak alloc {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    embedding = rng.normal(size=768).astype(np.float32)
+    batch_embeddings = rng.normal(size=(BATCH_SIZE, 768)).astype(np.float32)
+    batch_records = [USER_DATA] * BATCH_SIZE
+    buffer = allocate(BATCH_SIZE)
+
+    measure("single, legacy list + DataFrame", lambda: legacy_row(USER_DATA, embedding))
+    measure("single, assemble_features", lambda: assemble_features([USER_DATA], embedding[None, :]))
+    measure("single, preallocated buffer", lambda: assemble_features([USER_DATA], embedding[None, :], buffer))
+    measure(
+        f"batch {BATCH_SIZE}, legacy per-row",
+        lambda: [legacy_row(u, e) for u, e in zip(batch_records, batch_embeddings)]
+    )
+    measure(f"batch {BATCH_SIZE}, preallocated buffer", lambda: assemble_features(batch_records, batch_embeddings, buffer))
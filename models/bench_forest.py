@@ -0,0 +1,54 @@
+import copy
+
+import numpy as np
+
+from bench_common import report, time_calls
+from bundle import load_deployed
+from feature_store import build_feature_store
+from features import as_frame
+from forest_engine import FlatForest
+
+
+# --------- CONFIG ---------
+BATCH_SIZES = [1, 32, 1024]
+# Timed calls per batch size (fewer for the large batch)
+N_CALLS = {1: 200, 32: 50, 1024: 10}
+
+
+def batches(X, batch_size):
+    """Rolling windows over X: one warm-up call, then N_CALLS[batch_size] timed ones."""
+    return [
+        (X.iloc[start:start + batch_size],)
+        for start in (
+            (i * batch_size) % (len(X) - batch_size + 1)
+            for i in range(N_CALLS[batch_size] + 1)
+        )
+    ]
+
+
+if __name__ == "__main__":
+    bundle = load_deployed()
+    risk_model = bundle.risk_model
+    forest = FlatForest.from_sklearn(risk_model)
+    single_job = copy.deepcopy(risk_model).set_params(n_jobs=1)
+
+    X = as_frame(build_feature_store("testdata.csv").X)
+    if len(X) < max(BATCH_SIZES):
+        X = as_frame(np.resize(X.to_numpy(), (max(BATCH_SIZES), X.shape[1])))
+    print(
+        f"{forest.n_trees} trees, {len(forest.feature)} nodes, "
+        f"sklearn n_jobs={risk_model.n_jobs}"
+    )
+
+    engines = {
+        "sklearn": risk_model.predict_proba,
+        "sklearn n_jobs=1": single_job.predict_proba,
+        "flat": forest.predict_proba,
+    }
+    if bundle.risk_forest is not None:
+        # What the service runs: the same arrays, memory-mapped from the bundle
+        engines["flat (bundle mmap)"] = bundle.risk_forest.predict_proba
+    for batch_size in BATCH_SIZES:
+        for name, predict in engines.items():
+            latencies = time_calls(predict, batches(X, batch_size), warm_up=1)
+            report(f"batch={batch_size:<5} {name}", latencies, width=30, rows=batch_size)
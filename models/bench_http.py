@@ -0,0 +1,31 @@
+import json
+import socket
+import urllib.request
+
+
+# A /predict body for scripts that only need one valid request
+PAYLOAD = {
+    "user_data": {
+        "Age": 67,
+        "Gender": "Female",
+        "Blood_Pressure": 162.0,
+        "Heart_Rate": 104.0,
+        "Temperature": 99.4,
+        "Pre_Existing_Conditions": "Hypertension"
+    },
+    "symptoms": ["Patient complains of chest discomfort since this morning."]
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url, body=None, timeout=60):
+    """GET url (or POST body as JSON) and return the decoded JSON; HTTP errors raise HTTPError."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read())
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from profiling import StageTimer, peak_rss_mb, rss_mb
+
+
+# --------- CONFIG ---------
+PAYLOAD_CSV = "../synthetic_triage_8000.csv"
+SEED = 42
+# /predict: closed-loop clients, each sending its next request when the last returns
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+PREDICT_REQUESTS = 256
+# /predict_batch: patients per call, at each of BATCH_CONCURRENCY
+BATCH_SIZES = [1, 16, 64, 256]
+BATCH_CONCURRENCY = [1, 4]
+BATCH_PATIENTS = 1024
+# --compare flags a run whose p95 latency or throughput is this much worse
+REGRESSION_TOLERANCE = 0.15
+# Settings recorded with every run so results are compared like for like
+RECORDED_ENV = [
+    "EMBEDDING_BACKEND", "RISK_ENGINE", "EXPLANATION_BACKEND", "EXPLANATION_MODE",
+    "INFERENCE_WORKERS", "INFERENCE_MAX_QUEUE", "EMBED_BATCH_WINDOW_MS",
+    "EMBED_MAX_BATCH_SIZE", "PREDICT_BATCH_CHUNK_SIZE", "STAGE_TIMING", "WORKER_THREADS",
+    "ENCODER_COMPILE", "PRIORITY_AGING_S", "PREDICTION_CACHE_SIZE", "PREDICTION_CACHE_TTL_S",
+    "CASCADE_CONFIDENCE"
+]
+
+
+def load_payloads(n):
+    """n /predict bodies sampled (with a fixed seed) from the synthetic triage data."""
+    # keep_default_na=False keeps the literal "None" condition as a string
+    frame = pd.read_csv(PAYLOAD_CSV, keep_default_na=False)
+    rows = frame.sample(n, replace=n > len(frame), random_state=SEED)
+    return [
+        {
+            "user_data": {
+                "Age": int(row["Age"]),
+                "Gender": row["Gender"],
+                "Blood_Pressure": float(row["Blood_Pressure"]),
+                "Heart_Rate": float(row["Heart_Rate"]),
+                "Temperature": float(row["Temperature"]),
+                "Pre_Existing_Conditions": row["Pre-Existing_Conditions"]
+            },
+            "symptoms": [row["Symptoms"]]
+        }
+        for _, row in rows.iterrows()
+    ]
+
+
+def summarize(latencies, ok, errors, elapsed, items):
+    latencies = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": errors,
+        "throughput": items / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+    }
+
+
+async def closed_loop(concurrency, jobs, send):
+    """Run send(job) for every job with `concurrency` clients; returns (latencies, statuses, elapsed)."""
+    queue = list(reversed(jobs))
+    latencies, statuses = [], []
+
+    async def client():
+        while queue:
+            job = queue.pop()
+            start = time.perf_counter()
+            status = await send(job)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def run_benchmark():
+    # Every scenario replays the same seeded payloads, so with the /predict response
+    # cache on all but the first would be served from it. Set PREDICTION_CACHE_SIZE
+    # explicitly to benchmark the cache itself.
+    os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+    import httpx
+    import full_model
+
+    app = full_model.app
+    timer = StageTimer()
+    results = {"predict": [], "predict_batch": []}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def predict(payload):
+                return (await client.post("/predict", json=payload)).status_code
+
+            async def predict_batch(patients):
+                response = await client.post("/predict_batch", json={"patients": patients})
+                if response.status_code != 200:
+                    return response.status_code
+                # Per-line failures come back inside a 200 stream
+                return 500 if '"error"' in response.text else 200
+
+            # Warm-up: first forward pass, allocator and explainer caches
+            for payload in load_payloads(8):
+                await predict(payload)
+
+            for concurrency in CONCURRENCY_LEVELS:
+                payloads = load_payloads(PREDICT_REQUESTS)
+                with timer.stage(f"/predict c={concurrency}"):
+                    latencies, statuses, elapsed = await closed_loop(concurrency, payloads, predict)
+                ok = statuses.count(200)
+                peak = timer.stages[-1][3]
+                results["predict"].append({
+                    "concurrency": concurrency,
+                    **summarize(latencies, ok, len(statuses) - ok, elapsed, ok),
+                    "rejected_503": statuses.count(503),
+                    "rss_mb": rss_mb(),
+                    "peak_rss_mb": peak,
+                })
+
+            for batch_size in BATCH_SIZES:
+                for concurrency in BATCH_CONCURRENCY:
+                    payloads = load_payloads(BATCH_PATIENTS)
+                    batches = [
+                        payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)
+                    ]
+                    with timer.stage(f"/predict_batch n={batch_size} c={concurrency}"):
+                        latencies, statuses, elapsed = await closed_loop(
+                            concurrency, batches, predict_batch
+                        )
+                    ok = statuses.count(200)
+                    peak = timer.stages[-1][3]
+                    results["predict_batch"].append({
+                        "batch_size": batch_size,
+                        "concurrency": concurrency,
+                        # throughput is patients/s for batches
+                        **summarize(latencies, ok, len(statuses) - ok, elapsed, ok * batch_size),
+                        "rss_mb": rss_mb(),
+                        "peak_rss_mb": peak,
+                    })
+
+            health = (await client.get("/health")).json()
+
+    results["health"] = health
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run):
+    for row in run["predict"]:
+        print(
+            f"/predict       c={row['concurrency']:<3}       {row['throughput']:8.1f} req/s  "
+            f"p50={row['p50_ms']:8.1f} ms  p95={row['p95_ms']:8.1f} ms  p99={row['p99_ms']:8.1f} ms  "
+            f"503s={row['rejected_503']:<4} RSS={row['rss_mb']:7.1f} MB"
+        )
+    for row in run["predict_batch"]:
+        print(
+            f"/predict_batch n={row['batch_size']:<4} c={row['concurrency']:<3} "
+            f"{row['throughput']:8.1f} pat/s  "
+            f"p50={row['p50_ms']:8.1f} ms  p95={row['p95_ms']:8.1f} ms  p99={row['p99_ms']:8.1f} ms  "
+            f"errors={row['errors']:<3} RSS={row['rss_mb']:7.1f} MB"
+        )
+
+
+def compare(baseline_path, current_path):
+    """Print per-scenario deltas; returns True if any scenario regressed beyond tolerance."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"baseline {baseline['meta']['commit']}  vs  current {current['meta']['commit']}")
+
+    regressed = False
+    for endpoint, keys in (("predict", ("concurrency",)), ("predict_batch", ("batch_size", "concurrency"))):
+        before = {tuple(row[k] for k in keys): row for row in baseline[endpoint]}
+        for row in current[endpoint]:
+            key = tuple(row[k] for k in keys)
+            if key not in before:
+                continue
+            old = before[key]
+            p95_change = row["p95_ms"] / old["p95_ms"] - 1
+            throughput_change = row["throughput"] / old["throughput"] - 1
+            bad = p95_change > REGRESSION_TOLERANCE or throughput_change < -REGRESSION_TOLERANCE
+            regressed |= bad
+            label = " ".join(f"{k}={v}" for k, v in zip(keys, key))
+            print(
+                f"/{endpoint:<14} {label:<24} p95 {old['p95_ms']:8.1f} -> {row['p95_ms']:8.1f} ms "
+                f"({p95_change:+.0%})  throughput {throughput_change:+.0%}"
+                f"{'  REGRESSION' if bad else ''}"
+            )
+    return regressed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--compare":
+        sys.exit(1 if compare(sys.argv[2], sys.argv[3]) else 0)
+
+    commit = git_commit()
+    output = sys.argv[1] if len(sys.argv) > 1 else f"bench_results/service-{commit or 'unknown'}.json"
+
+    run = asyncio.run(run_benchmark())
+    run["meta"] = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {name: os.environ[name] for name in RECORDED_ENV if name in os.environ},
+        "model_version": run["health"]["model_version"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print_run(run)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {output}")
@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import time
+import urllib.error
+
+import numpy as np
+
+from bench_common import write_results
+from bench_http import PAYLOAD, free_port, request
+
+
+# --------- CONFIG ---------
+N_RUNS = 3
+STARTUP_TIMEOUT_S = 300
+POLL_INTERVAL_S = 0.05
+
+
+def time_import():
+    """Seconds to import full_model in a fresh interpreter (no startup hooks run)."""
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import time; t = time.perf_counter(); import full_model; "
+         "print(time.perf_counter() - t)"],
+        capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_startup():
+    """Start uvicorn and return (time_to_first_healthy, time_to_first_prediction) in seconds."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "full_model:app", "--port", str(port),
+         "--log-level", "warning"],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        healthy = None
+        while time.perf_counter() - start < STARTUP_TIMEOUT_S:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                if request(f"{base}/health", timeout=STARTUP_TIMEOUT_S)["models_loaded"]:
+                    healthy = time.perf_counter() - start
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(POLL_INTERVAL_S)
+        if healthy is None:
+            raise RuntimeError(f"Not healthy after {STARTUP_TIMEOUT_S}s")
+
+        # A failed prediction raises urllib.error.HTTPError
+        request(f"{base}/predict", PAYLOAD, timeout=STARTUP_TIMEOUT_S)
+        return healthy, time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    imports, healthy, predicted = [], [], []
+    for run in range(N_RUNS):
+        imports.append(time_import())
+        to_healthy, to_prediction = time_startup()
+        healthy.append(to_healthy)
+        predicted.append(to_prediction)
+        print(
+            f"run {run + 1}: import {imports[-1]:6.2f}s  first healthy {to_healthy:6.2f}s  "
+            f"first prediction {to_prediction:6.2f}s"
+        )
+
+    results = {
+        "import_seconds": float(np.median(imports)),
+        "time_to_first_healthy_seconds": float(np.median(healthy)),
+        "time_to_first_prediction_seconds": float(np.median(predicted)),
+        "runs": N_RUNS,
+    }
+    print(
+        f"median: import {results['import_seconds']:.2f}s  "
+        f"first healthy {results['time_to_first_healthy_seconds']:.2f}s  "
+        f"first prediction {results['time_to_first_prediction_seconds']:.2f}s"
+    )
+    write_results(results)
@@ -0,0 +1,95 @@
+import os
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_common import write_results
+from bench_http import request
+from bench_service import load_payloads
+from bench_workers import start_gunicorn
+
+
+# --------- CONFIG ---------
+N_WORKERS = int(os.getenv("SERVE_WORKERS", "4"))
+# Closed-loop clients per worker, so every worker has requests queued
+CLIENTS_PER_WORKER = 2
+REQUESTS = 400
+WARM_REQUESTS_PER_WORKER = 4
+# Each configuration runs in a fresh gunicorn: thread settings are per process
+CONFIGS = {
+    "library defaults": {"WORKER_THREADS": "-1", "ENCODER_COMPILE": "eager"},
+    "thread budget": {"WORKER_THREADS": "0", "ENCODER_COMPILE": "eager"},
+    "budget + torchscript": {"WORKER_THREADS": "0", "ENCODER_COMPILE": "torchscript"},
+    "budget + torch.compile": {"WORKER_THREADS": "0", "ENCODER_COMPILE": "compile"},
+}
+
+
+def unique_payloads(n, offset=0):
+    """Payloads with distinct symptom texts, so neither cache hides the encoder."""
+    payloads = load_payloads(n)
+    for i, payload in enumerate(payloads, start=offset):
+        payload["symptoms"] = [f"{payload['symptoms'][0]} (visit {i})"]
+    return payloads
+
+
+def send(base, payload):
+    start = time.perf_counter()
+    try:
+        request(f"{base}/predict", payload)
+        status = 200
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def measure(name, settings):
+    master, base, ready = start_gunicorn(N_WORKERS, **settings)
+    try:
+        # Each worker traces / compiles in its own warm-up; these reach the steady state
+        for payload in unique_payloads(WARM_REQUESTS_PER_WORKER * N_WORKERS, offset=REQUESTS):
+            send(base, payload)
+
+        clients = CLIENTS_PER_WORKER * N_WORKERS
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as executor:
+            results = list(executor.map(lambda p: send(base, p), unique_payloads(REQUESTS)))
+        elapsed = time.perf_counter() - start
+        health = request(f"{base}/health")
+    finally:
+        master.terminate()
+        master.wait()
+
+    latencies = np.array([latency for latency, status in results if status == 200]) * 1000
+    return {
+        "config": name,
+        **settings,
+        "encoder_compile_used": health["encoder_compile"],
+        "thread_budget": health["thread_budget"],
+        "workers": N_WORKERS,
+        "clients": clients,
+        "ready_seconds": ready,
+        "ok": len(latencies),
+        "errors": len(results) - len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+    }
+
+
+if __name__ == "__main__":
+    print(f"{N_WORKERS} workers, {os.cpu_count()} cores, {CLIENTS_PER_WORKER * N_WORKERS} clients")
+    results = []
+    for name, settings in CONFIGS.items():
+        row = measure(name, settings)
+        results.append(row)
+        print(
+            f"{name:<24} ({row['encoder_compile_used']:<11}) ready {row['ready_seconds']:6.1f}s  "
+            f"{row['throughput']:7.1f} req/s  p50={row['p50_ms']:8.1f} ms  "
+            f"p95={row['p95_ms']:8.1f} ms  p99={row['p99_ms']:8.1f} ms  errors={row['errors']}"
+        )
+
+    write_results(results)
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+
+from bench_common import write_results
+from bench_http import PAYLOAD, free_port, request
+
+
+# --------- CONFIG ---------
+WORKER_COUNTS = [1, 4, 8]
+STARTUP_TIMEOUT_S = 600
+# Predictions sent per worker before measuring, so every worker has a warm working set
+WARM_REQUESTS_PER_WORKER = 8
+
+
+def memory_mb(pid):
+    """RSS, PSS and USS (private pages) of pid in MB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def children(pid):
+    """Direct child processes of pid (the gunicorn workers)."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The parent pid follows the ")" that closes the command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            pids.append(int(entry))
+    return pids
+
+
+def start_gunicorn(n_workers, **env):
+    """
+    Start gunicorn with n_workers and extra environment settings; returns
+    (master process, base url, seconds until every worker was healthy).
+    """
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, SERVE_WORKERS=str(n_workers), SERVE_BIND=f"127.0.0.1:{port}", **env)
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "full_model:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # Each new connection may land on any worker: wait until all have answered
+        seen = set()
+        start = time.perf_counter()
+        while len(seen) < n_workers:
+            if master.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {master.returncode}")
+            if time.perf_counter() - start > STARTUP_TIMEOUT_S:
+                raise RuntimeError(f"Only {len(seen)}/{n_workers} workers healthy")
+            try:
+                health = request(f"{base}/health")
+                if health["models_loaded"]:
+                    seen.add(health["worker_pid"])
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+    except BaseException:
+        master.terminate()
+        master.wait()
+        raise
+    return master, base, time.perf_counter() - start
+
+
+def measure(n_workers, preload):
+    master, base, ready = start_gunicorn(n_workers, SERVE_PRELOAD="1" if preload else "0")
+    try:
+        for _ in range(WARM_REQUESTS_PER_WORKER * n_workers):
+            request(f"{base}/predict", PAYLOAD)
+
+        workers = [memory_mb(pid) for pid in children(master.pid)]
+        parent = memory_mb(master.pid)
+    finally:
+        master.terminate()
+        master.wait()
+
+    total_pss = parent["pss"] + sum(w["pss"] for w in workers)
+    return {
+        "workers": n_workers,
+        "preload": preload,
+        "ready_seconds": ready,
+        "worker_rss_mb": sum(w["rss"] for w in workers) / len(workers),
+        "worker_pss_mb": sum(w["pss"] for w in workers) / len(workers),
+        "worker_uss_mb": sum(w["uss"] for w in workers) / len(workers),
+        "master_rss_mb": parent["rss"],
+        "total_pss_mb": total_pss,
+    }
+
+
+if __name__ == "__main__":
+    results = []
+    for preload in (False, True):
+        for n_workers in WORKER_COUNTS:
+            row = measure(n_workers, preload)
+            results.append(row)
+            print(
+                f"{'preload' if preload else 'per-worker':<10} workers={n_workers:<2} "
+                f"ready {row['ready_seconds']:6.1f}s  per worker: RSS {row['worker_rss_mb']:7.1f} MB  "
+                f"PSS {row['worker_pss_mb']:7.1f} MB  private {row['worker_uss_mb']:7.1f} MB  |  "
+                f"total PSS {row['total_pss_mb']:8.1f} MB"
+            )
+
+    write_results(results)
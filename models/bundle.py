@@ -0,0 +1,225 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+
+import joblib
+import xgboost as xgb
+
+from config import MODEL_BUNDLE_DIR
+from features import FEATURE_COLUMNS, GENDER_CODES, PRE_EXISTING_CODES
+from forest_engine import FlatForest
+from to_embeddings import MODEL_NAME
+
+
+BUNDLE_FORMAT = 1
+RISK_MODEL_FILE = "risk_model.joblib"
+RISK_FOREST_DIR = "risk_forest"
+DEPARTMENT_MODEL_FILE = "department_model.ubj"
+
+RISK_LABELS = ["Low Risk", "Medium Risk", "High Risk"]
+# Department order of the LabelEncoder in training.py, used for legacy pickles
+# that were saved without a manifest
+LEGACY_DEPARTMENT_LABELS = ["Cardiology", "General Medicine", "Neurology", "Pulmonology"]
+
+
+class BundleError(ValueError):
+    """The bundle on disk is incomplete, corrupted or incompatible with this code."""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_bundle(directory, risk_model, department_model, department_labels):
+    """
+    Write a model bundle:
+      risk_model.joblib     sklearn RandomForest (for RISK_ENGINE=sklearn and the shap backend)
+      risk_forest/*.npy     the same forest as FlatForest arrays, memory-mapped by the service
+      department_model.ubj  XGBoost native UBJSON (no pickle, version independent)
+      manifest.json         column order, encodings, class labels and file hashes
+    The manifest is written last, so a bundle without one is incomplete.
+    Every file is written beside its target and renamed over it, so a service
+    still memory-mapping the previous forest keeps reading intact pages.
+    """
+    os.makedirs(directory, exist_ok=True)
+    risk_path = os.path.join(directory, RISK_MODEL_FILE)
+    department_path = os.path.join(directory, DEPARTMENT_MODEL_FILE)
+
+    joblib.dump(risk_model, risk_path + ".tmp")
+    os.replace(risk_path + ".tmp", risk_path)
+    # save_model picks the format from the extension, so keep .ubj last
+    department_tmp = os.path.join(directory, "tmp-" + DEPARTMENT_MODEL_FILE)
+    department_model.save_model(department_tmp)
+    os.replace(department_tmp, department_path)
+
+    forest = FlatForest.from_sklearn(risk_model)
+    forest_paths = forest.save(os.path.join(directory, RISK_FOREST_DIR))
+
+    files = {
+        "risk_model": {"path": RISK_MODEL_FILE, "sha256": _sha256(risk_path)},
+        "department_model": {"path": DEPARTMENT_MODEL_FILE, "sha256": _sha256(department_path)},
+    }
+    for name, path in forest_paths.items():
+        files[f"risk_forest.{name}"] = {
+            "path": os.path.relpath(path, directory), "sha256": _sha256(path)
+        }
+    # The version identifies the exact weights: a hash over every model file
+    version = hashlib.sha256(
+        "".join(f["sha256"] for f in files.values()).encode("ascii")
+    ).hexdigest()[:12]
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "embedding_model": MODEL_NAME,
+        "feature_columns": FEATURE_COLUMNS,
+        "encodings": {
+            "Gender": GENDER_CODES,
+            "Pre-Existing_Conditions": PRE_EXISTING_CODES
+        },
+        "labels": {
+            "risk": RISK_LABELS,
+            "department": [str(label) for label in department_labels]
+        },
+        "files": files
+    }
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+class ModelBundle:
+    """
+    Loaded models plus the metadata needed to serve them.
+
+    risk_forest: the RandomForest as memory-mapped FlatForest arrays, or None
+    for bundles without them. When it is set, the sklearn risk_model is only
+    unpickled on first access (load_risk_model), so a service using the
+    flat engine and the approximate explainer never holds a private copy of it.
+    """
+
+    def __init__(self, risk_model, department_model, risk_labels, department_labels,
+                 version, load_seconds, manifest=None, risk_forest=None, load_risk_model=None):
+        self._risk_model = risk_model
+        self._load_risk_model = load_risk_model
+        self.risk_forest = risk_forest
+        self.department_model = department_model
+        self.risk_labels = risk_labels
+        self.department_labels = department_labels
+        self.version = version
+        self.load_seconds = load_seconds
+        self.manifest = manifest
+
+    @property
+    def risk_model(self):
+        if self._risk_model is None:
+            self._risk_model = self._load_risk_model()
+        return self._risk_model
+
+
+def _load_risk_model(path, sha256):
+    """Unpickle the sklearn forest from one read of the file, checked against its hash."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != sha256:
+        raise BundleError(f"Checksum mismatch for risk_model ({path})")
+    risk_model = joblib.load(io.BytesIO(data))
+    if list(risk_model.feature_names_in_) != FEATURE_COLUMNS:
+        raise BundleError("risk model was trained on a different column order")
+    return risk_model
+
+
+def load_bundle(directory):
+    """Load and validate a bundle written by save_bundle()."""
+    start = time.perf_counter()
+    manifest_path = os.path.join(directory, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BundleError(f"No manifest.json in {directory}")
+
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format: {manifest.get('format')}")
+    if manifest["feature_columns"] != FEATURE_COLUMNS:
+        raise BundleError("Bundle feature columns do not match features.FEATURE_COLUMNS")
+    encodings = manifest["encodings"]
+    if encodings["Gender"] != GENDER_CODES or encodings["Pre-Existing_Conditions"] != PRE_EXISTING_CODES:
+        raise BundleError("Bundle categorical encodings do not match features.py")
+    if manifest["embedding_model"] != MODEL_NAME:
+        raise BundleError(f"Bundle was trained on {manifest['embedding_model']} embeddings")
+
+    forest_paths = {}
+    for name, entry in manifest["files"].items():
+        path = os.path.join(directory, entry["path"])
+        if name == "risk_model":
+            # Hashed in the same read that unpickles it, if it is ever needed
+            continue
+        # Hashing pages the forest arrays into the page cache that np.load then maps
+        if _sha256(path) != entry["sha256"]:
+            raise BundleError(f"Checksum mismatch for {name} ({path})")
+        if name.startswith(f"{RISK_FOREST_DIR}."):
+            forest_paths[name.split(".", 1)[1]] = path
+
+    risk_entry = manifest["files"]["risk_model"]
+    risk_path = os.path.join(directory, risk_entry["path"])
+    risk_forest = None
+    risk_model = None
+    if forest_paths:
+        risk_forest = FlatForest.load(forest_paths, FEATURE_COLUMNS)
+    else:
+        # Bundles written before the forest arrays existed
+        risk_model = _load_risk_model(risk_path, risk_entry["sha256"])
+
+    department_model = xgb.XGBClassifier()
+    department_model.load_model(
+        os.path.join(directory, manifest["files"]["department_model"]["path"])
+    )
+    if list(department_model.feature_names_in_) != FEATURE_COLUMNS:
+        raise BundleError("department model was trained on a different column order")
+
+    return ModelBundle(
+        risk_model,
+        department_model,
+        manifest["labels"]["risk"],
+        manifest["labels"]["department"],
+        manifest["version"],
+        time.perf_counter() - start,
+        manifest,
+        risk_forest=risk_forest,
+        load_risk_model=lambda: _load_risk_model(risk_path, risk_entry["sha256"])
+    )
+
+
+def load_legacy(risk_path="risk_model.pkl", department_path="xg.pkl"):
+    """Load the pickles written by older training runs (no manifest to validate)."""
+    start = time.perf_counter()
+    risk_model = joblib.load(risk_path)
+    with open(department_path, "rb") as f:
+        department_model = pickle.load(f)
+    return ModelBundle(
+        risk_model,
+        department_model,
+        RISK_LABELS,
+        LEGACY_DEPARTMENT_LABELS,
+        "legacy",
+        time.perf_counter() - start
+    )
+
+
+def load_deployed(directory=MODEL_BUNDLE_DIR):
+    """The models the service would serve: the bundle in directory, or the legacy pickles without one."""
+    if os.path.exists(os.path.join(directory, "manifest.json")):
+        return load_bundle(directory)
+    return load_legacy()
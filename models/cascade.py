@@ -0,0 +1,165 @@
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from bundle import RISK_LABELS
+from config import CASCADE_MAX_DEPTH, CASCADE_MIN_LEAF, CASCADE_PATH
+from featurize import file_hash
+from features import GENDER_CODES, PRE_EXISTING_CODES, STRUCTURED_FEATURES, write_structured
+
+
+# Encoded columns shown as category names in rule text
+CATEGORIES = {
+    "Gender": GENDER_CODES,
+    "Pre-Existing_Conditions": PRE_EXISTING_CODES,
+}
+
+
+def structured_matrix(records):
+    """float32 (n, len(STRUCTURED_FEATURES)) matrix; records as in features.write_structured."""
+    return write_structured(records, np.empty((len(records), len(STRUCTURED_FEATURES)), dtype=np.float32))
+
+
+class VitalsCascade:
+    """
+    Cheap first stage in front of the full pipeline.
+
+    A shallow decision tree over the structured columns only, trained on the
+    joint (risk, department) label. Every leaf is a rule on the vitals; its
+    confidence is the share of training patients under it whose risk and
+    department both match the rule's answer. decide() answers the patients
+    whose rule clears a threshold and leaves the rest to BERT and the models.
+    """
+
+    def __init__(self, tree, pairs, version):
+        self.tree = tree
+        self.pairs = pairs
+        self.version = version
+        tree_ = tree.tree_
+        n_nodes = tree_.node_count
+
+        fractions = tree_.value[:, 0, :]
+        # sklearn < 1.4 stores weighted class counts rather than fractions
+        fractions = fractions / fractions.sum(axis=1, keepdims=True)
+        self.confidence = np.zeros(n_nodes)
+        self.responses = {}
+        for node, rule in self._rules():
+            best = int(np.argmax(fractions[node]))
+            risk, department = pairs[tree.classes_[best]]
+            share_risk = sum(f for c, f in zip(tree.classes_, fractions[node]) if pairs[c][0] == risk)
+            share_department = sum(
+                f for c, f in zip(tree.classes_, fractions[node]) if pairs[c][1] == department
+            )
+            support = int(tree_.n_node_samples[node])
+            self.confidence[node] = fractions[node, best]
+            self.responses[node] = {
+                "risk": risk,
+                "risk_explanation": (
+                    f"Vitals rule ({rule}): {share_risk:.0%} of {support} training patients "
+                    f"under it were {risk}"
+                ),
+                "department": department,
+                "department_explanation": (
+                    f"Vitals rule ({rule}): {share_department:.0%} of {support} training patients "
+                    f"under it went to {department}"
+                ),
+                "model_version": version,
+            }
+
+    @classmethod
+    def fit(cls, csv_path, max_depth=CASCADE_MAX_DEPTH, min_samples_leaf=CASCADE_MIN_LEAF):
+        """Train on a labelled triage CSV (the columns of datase.csv)."""
+        frame = pd.read_csv(csv_path)
+        X = structured_matrix(frame)
+        risks = [RISK_LABELS[int(level)] for level in frame["Risk_Level"]]
+        pairs = sorted(set(zip(risks, frame["Department"])))
+        codes = {pair: code for code, pair in enumerate(pairs)}
+        y = np.array([codes[pair] for pair in zip(risks, frame["Department"])])
+
+        tree = DecisionTreeClassifier(
+            max_depth=max_depth, min_samples_leaf=min_samples_leaf, random_state=0
+        )
+        tree.fit(X, y)
+        version = f"cascade-{file_hash(csv_path)[:8]}-d{max_depth}-l{min_samples_leaf}"
+        return cls(tree, pairs, version)
+
+    def _rules(self):
+        """(leaf node, readable rule) for every leaf, from the split bounds on its path."""
+        tree_ = self.tree.tree_
+        stack = [(0, {})]
+        while stack:
+            node, bounds = stack.pop()
+            if tree_.children_left[node] == -1:
+                yield node, self._describe(bounds)
+                continue
+            name = STRUCTURED_FEATURES[tree_.feature[node]]
+            low, high = bounds.get(name, (-np.inf, np.inf))
+            threshold = tree_.threshold[node]
+            stack.append((tree_.children_left[node], {**bounds, name: (low, min(high, threshold))}))
+            stack.append((tree_.children_right[node], {**bounds, name: (max(low, threshold), high)}))
+
+    @staticmethod
+    def _describe(bounds):
+        parts = []
+        for name in STRUCTURED_FEATURES:
+            if name not in bounds:
+                continue
+            low, high = bounds[name]
+            if name in CATEGORIES:
+                allowed = [label for label, code in CATEGORIES[name].items() if low < code <= high]
+                parts.append(f"{name}: {' or '.join(allowed)}")
+            elif low == -np.inf:
+                parts.append(f"{name} <= {high:g}")
+            elif high == np.inf:
+                parts.append(f"{name} > {low:g}")
+            else:
+                parts.append(f"{low:g} < {name} <= {high:g}")
+        return ", ".join(parts) or "any vitals"
+
+    def apply(self, X):
+        """Leaf of every row, like DecisionTreeClassifier.apply without its per-call validation."""
+        tree_ = self.tree.tree_
+        rows = np.arange(len(X))
+        nodes = np.zeros(len(X), dtype=np.intp)
+        for _ in range(tree_.max_depth):
+            # Leaves have feature -2 and no children: they stay where they are
+            at_leaf = tree_.children_left[nodes] == -1
+            go_left = X[rows, tree_.feature[nodes]] <= tree_.threshold[nodes]
+            step = np.where(go_left, tree_.children_left[nodes], tree_.children_right[nodes])
+            nodes = np.where(at_leaf, nodes, step)
+        return nodes
+
+    def decide(self, records, threshold):
+        """
+        records: list of dicts with the training column names (see to_user_data_dict)
+        returns: per record, a finished prediction if its rule's confidence is at
+        least threshold, else None
+        """
+        leaves = self.apply(structured_matrix(records))
+        confident = self.confidence[leaves] >= threshold
+        return [dict(self.responses[leaf]) if ok else None for leaf, ok in zip(leaves, confident)]
+
+
+def save_cascade(cascade, path=CASCADE_PATH):
+    # The tree and labels only: the rule text and responses are rebuilt on load,
+    # and the file does not depend on where VitalsCascade is defined
+    joblib.dump({"tree": cascade.tree, "pairs": cascade.pairs, "version": cascade.version}, path)
+
+
+def load_cascade(path=CASCADE_PATH):
+    return VitalsCascade(**joblib.load(path))
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "datase.csv"
+    cascade = VitalsCascade.fit(csv_path)
+    save_cascade(cascade)
+    for node, rule in sorted(cascade._rules(), key=lambda item: -cascade.confidence[item[0]]):
+        response = cascade.responses[node]
+        print(
+            f"{cascade.confidence[node]:5.0%}  {response['risk']:<12} {response['department']:<17} {rule}"
+        )
+    print(f"Saved {cascade.version} to {CASCADE_PATH}")
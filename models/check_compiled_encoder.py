@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bundle import load_deployed
+from check_encoder import check_predictions, embed_all, predictions
+from to_embeddings import create_engine
+
+
+# --------- CONFIG ---------
+# Largest allowed difference from the eager encoder in any CLS vector component
+# (warm_up() accepts a graph within rtol=1e-3, atol=1e-4 on its warm-up texts only)
+MAX_EMBEDDING_DIFF = 1e-3
+
+
+if __name__ == "__main__":
+    # ENCODER_COMPILE values to check against the eager torch encoder
+    modes = sys.argv[1:] or ["torchscript", "compile"]
+
+    testset = pd.read_csv("testdata.csv", keep_default_na=False)
+    texts = testset["Symptoms"].tolist()
+    bundle = load_deployed()
+    models = {"risk": bundle.risk_model, "department": bundle.department_model}
+
+    reference_embeddings = embed_all(create_engine("torch", compile_mode="eager"), texts)
+    reference = predictions(models, testset, reference_embeddings)
+
+    failed = False
+    for mode in modes:
+        engine = create_engine("torch", compile_mode=mode)
+        engine.warm_up()
+        if engine.compile_mode != mode:
+            # warm_up() fell back to eager, so the service would never run this graph
+            print(f"[{mode}] rejected at warm-up  FAIL")
+            failed = True
+            continue
+
+        embeddings = embed_all(engine, texts)
+        max_diff = np.abs(embeddings - reference_embeddings).max()
+        ok = max_diff <= MAX_EMBEDDING_DIFF
+        failed |= not ok
+        print(f"[{mode}] max |embedding - eager|={max_diff:.2e}  {'OK' if ok else 'FAIL'}")
+        failed |= not check_predictions(mode, models, testset, embeddings, reference)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,66 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bundle import load_deployed
+from features import as_frame, assemble_features
+from to_embeddings import create_engine
+
+
+# --------- CONFIG ---------
+# Fraction of testdata.csv rows whose risk/department prediction must match fp32
+MIN_AGREEMENT = 0.99
+# Largest allowed change in any predicted class probability
+MAX_PROBA_DIFF = 0.05
+BATCH_SIZE = 64
+
+
+def embed_all(engine, texts):
+    return np.vstack([
+        engine.embed(texts[i:i + BATCH_SIZE]).cpu().numpy()
+        for i in range(0, len(texts), BATCH_SIZE)
+    ])
+
+
+def predictions(models, testset, embeddings):
+    X = as_frame(assemble_features(testset, embeddings))
+    return {name: model.predict_proba(X) for name, model in models.items()}
+
+
+def check_predictions(label, models, testset, embeddings, reference):
+    """Print each model's agreement with the reference predictions; True if all pass."""
+    passed = True
+    for name, proba in predictions(models, testset, embeddings).items():
+        agreement = (proba.argmax(axis=1) == reference[name].argmax(axis=1)).mean()
+        max_diff = np.abs(proba - reference[name]).max()
+        ok = agreement >= MIN_AGREEMENT and max_diff <= MAX_PROBA_DIFF
+        passed &= ok
+        print(
+            f"[{label}] {name:<10} agreement={agreement:.2%}  "
+            f"max |dp|={max_diff:.4f}  {'OK' if ok else 'FAIL'}"
+        )
+    return passed
+
+
+if __name__ == "__main__":
+    backends = sys.argv[1:] or ["onnx", "onnx-int8"]
+
+    testset = pd.read_csv("testdata.csv", keep_default_na=False)
+    texts = testset["Symptoms"].tolist()
+    bundle = load_deployed()
+    models = {"risk": bundle.risk_model, "department": bundle.department_model}
+
+    reference_embeddings = embed_all(create_engine("torch"), texts)
+    reference = predictions(models, testset, reference_embeddings)
+
+    failed = False
+    for backend in backends:
+        embeddings = embed_all(create_engine(backend), texts)
+        cosine = np.sum(embeddings * reference_embeddings, axis=1) / (
+            np.linalg.norm(embeddings, axis=1) * np.linalg.norm(reference_embeddings, axis=1)
+        )
+        print(f"[{backend}] min cosine similarity to fp32: {cosine.min():.5f}")
+        failed |= not check_predictions(backend, models, testset, embeddings, reference)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,95 @@
+import functools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench_explanation import load_sample_features
+from bundle import load_deployed
+from explanation import build_explainer
+
+
+# --------- CONFIG ---------
+N_ROWS = 200
+MODE = "structured"
+# The default backend is exact TreeSHAP for both models, so it must match shap's
+# own TreeSHAP up to float32 rounding
+SHAP_ATOL = 1e-4
+
+
+def contributions(model, X, explainer):
+    """Contributions for the predicted class of each row: (rows, outputs)."""
+    X = pd.DataFrame(X, columns=model.feature_names_in_)
+    pred = model.predict(X)
+    return explainer.contributions(X)[np.arange(len(X)), :, pred]
+
+
+def independent_shap(model):
+    """
+    shap's reference explainer, forced onto shap's own TreeSHAP code.
+    For XGBoost models shap.TreeExplainer otherwise just calls
+    booster.predict(pred_contribs=True), which is exactly what the fast
+    backend does, so the comparison would check XGBoost against itself.
+    """
+    explainer = build_explainer(model, backend="shap", mode=MODE)
+    # Any model type other than "internal" takes that shortcut; the trees shap
+    # parsed from the booster are walked by its C++ TreeSHAP instead
+    explainer.explainer.model.model_type = "internal"
+    # shap's reconstructed margin can differ slightly from XGBoost's base_score,
+    # so its additivity check is skipped: only the per-feature values are compared
+    explainer.explainer.shap_values = functools.partial(
+        explainer.explainer.shap_values, check_additivity=False
+    )
+    return explainer
+
+
+def check_exact(name, model, X, reference):
+    """True if the fast backend matches the reference TreeSHAP values."""
+    fast = contributions(model, X, build_explainer(model, backend="fast", mode=MODE))
+    max_diff = np.abs(fast - contributions(model, X, reference)).max()
+    ok = max_diff <= SHAP_ATOL
+    print(f"{name} max |fast - shap TreeSHAP|: {max_diff:.2e} ({'ok' if ok else 'FAILED'})")
+    return ok
+
+
+if __name__ == "__main__":
+    X = load_sample_features(N_ROWS)
+    bundle = load_deployed()
+    print(f"Model version {bundle.version}")
+    failed = False
+
+    # ---- Department model (XGBoost) ----
+    xg_model = bundle.department_model
+    failed |= not check_exact("XGBoost", xg_model, X, independent_shap(xg_model))
+
+    # ---- Risk model (RandomForest) ----
+    risk_model = bundle.risk_model
+    reference = build_explainer(risk_model, backend="shap", mode=MODE)
+    failed |= not check_exact("RandomForest", risk_model, X, reference)
+
+    # ---- Approximate forest backend ----
+    # Path-based contributions are not SHAP values, so there is no tolerance to meet:
+    # the drift is reported for whoever opts into EXPLANATION_BACKEND=approximate
+    X_frame = pd.DataFrame(X, columns=risk_model.feature_names_in_)
+    # Walked on the bundle's memory-mapped forest when it has one, as the service does
+    approximate = build_explainer(
+        risk_model, backend="approximate", mode=MODE, forest=bundle.risk_forest
+    )
+    total = approximate.contributions(X_frame).sum(axis=1) + approximate.expected_value
+    additive = np.allclose(total, risk_model.predict_proba(X_frame))
+    print(f"Approximate forest contributions additive: {additive}")
+    failed |= not additive
+
+    approx = contributions(risk_model, X, approximate)
+    exact = contributions(risk_model, X, reference)
+    relative = np.abs(approx - exact).mean() / np.abs(exact).mean()
+    nonzero = exact != 0
+    sign_flips = (np.sign(approx[nonzero]) != np.sign(exact[nonzero])).mean()
+    top1 = (approx.argmax(axis=1) == exact.argmax(axis=1)).mean()
+    print(f"Approximate vs TreeSHAP: mean |diff| {relative:.1%} of mean |shap|, "
+          f"sign flips {sign_flips:.1%}, top feature agreement {top1:.1%}")
+
+    if failed:
+        print("Explanations disagree with the shap reference.")
+        sys.exit(1)
+    print("Default explanations match the shap reference.")
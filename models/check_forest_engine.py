@@ -0,0 +1,63 @@
+import sys
+import tempfile
+
+import numpy as np
+
+from bundle import load_deployed
+from explanation import build_explainer
+from feature_store import build_feature_store
+from features import as_frame
+from forest_engine import FlatForest
+
+
+if __name__ == "__main__":
+    bundle = load_deployed()
+    risk_model = bundle.risk_model
+    print(f"Model version {bundle.version}")
+    # sklearn sums the trees in whatever order its threads finish; one job sums
+    # them in tree order, which is what FlatForest reproduces
+    risk_model.set_params(n_jobs=1)
+    forest = FlatForest.from_sklearn(risk_model)
+
+    X = as_frame(build_feature_store("testdata.csv").X)
+    failed = False
+
+    leaves = forest.apply(X) - forest.roots
+    same_leaves = np.array_equal(leaves, risk_model.apply(X))
+    print(f"Leaves match sklearn apply(): {same_leaves}")
+
+    reference = risk_model.predict_proba(X)
+    batch = forest.predict_proba(X)
+    rows = np.vstack([forest.predict_proba(X.iloc[[i]]) for i in range(len(X))])
+    for name, proba in (("batch", batch), ("row by row", rows)):
+        identical = np.array_equal(proba, reference)
+        print(f"predict_proba ({name}) bit-identical on {len(X)} rows: {identical}")
+        if not identical:
+            print(f"  max |dp| = {np.abs(proba - reference).max():.3e}")
+        failed |= not identical
+
+    # The approximate backend is the one that walks the forest itself
+    explainer = build_explainer(risk_model, backend="approximate")
+    flat_explainer = build_explainer(risk_model, backend="approximate", forest=forest)
+    max_diff = np.abs(flat_explainer.contributions(X) - explainer.contributions(X)).max()
+    print(f"Explanation contributions max |flat - sklearn paths|: {max_diff:.2e}")
+
+    # The copy a bundle memory-maps must behave exactly like the forest it was saved from
+    with tempfile.TemporaryDirectory() as directory:
+        mapped = FlatForest.load(forest.save(directory), forest.feature_names_in_)
+        same_mapped = np.array_equal(mapped.predict_proba(X), batch)
+        mapped_diff = np.abs(
+            build_explainer(mapped, backend="approximate").contributions(X)
+            - flat_explainer.contributions(X)
+        ).max()
+    print(f"Memory-mapped forest: predict_proba identical {same_mapped}, "
+          f"contributions max diff {mapped_diff:.2e}")
+
+    failed |= not same_leaves or max_diff > 1e-9 or not same_mapped or mapped_diff > 0
+
+    # ... and so must the arrays the deployed bundle maps
+    if bundle.risk_forest is not None:
+        same_deployed = np.array_equal(bundle.risk_forest.predict_proba(X), batch)
+        print(f"Bundle risk_forest arrays: predict_proba identical {same_deployed}")
+        failed |= not same_deployed
+    sys.exit(1 if failed else 0)
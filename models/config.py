@@ -0,0 +1,127 @@
+import os
+
+
+# Service settings, overridable through environment variables.
+
+# --------- EMBEDDING BATCHER ---------
+# How long (ms) the batcher waits for more symptom texts before running BERT
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+# Upper bound on texts per forward pass
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+
+# --------- EMBEDDING CACHE ---------
+# In-process LRU entries and time-to-live in seconds (0 = never expire)
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+EMBED_CACHE_TTL_S = float(os.getenv("EMBED_CACHE_TTL_S", "0"))
+# Directory for the on-disk store shared by all workers ("" = memory only)
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "")
+# Bump to invalidate cached vectors without changing the model name
+EMBED_CACHE_VERSION = os.getenv("EMBED_CACHE_VERSION", "")
+
+# --------- EXPLANATIONS ---------
+# "fast" = exact TreeSHAP (native XGBoost contributions, the shap package for the forest),
+# "approximate" = "fast" but path-based forest contributions: far cheaper on deep forests,
+# not SHAP values (see explanation.ForestContribExplainer), "shap" = shap package for both
+EXPLANATION_BACKEND = os.getenv("EXPLANATION_BACKEND", "fast")
+# "structured" = six vitals/history features + one symptom-text group, "full" = all 774 columns
+EXPLANATION_MODE = os.getenv("EXPLANATION_MODE", "structured")
+
+# --------- RISK MODEL ENGINE ---------
+# "flat" walks the RandomForest with forest_engine.FlatForest (same probabilities, far less
+# per-call overhead), "sklearn" calls the model directly
+RISK_ENGINE = os.getenv("RISK_ENGINE", "flat")
+
+# --------- BATCH SCORING ---------
+# Patients per model pass / streamed chunk on /predict_batch (their distinct symptom
+# texts are queued on the embedding batcher, so keep it below EMBED_MAX_QUEUE)
+PREDICT_BATCH_CHUNK_SIZE = int(os.getenv("PREDICT_BATCH_CHUNK_SIZE", "64"))
+
+# --------- INFERENCE POOL ---------
+# Worker threads for CPU-bound model work and how many jobs may wait for one
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+# Symptom texts allowed to wait for the embedding batcher
+EMBED_MAX_QUEUE = int(os.getenv("EMBED_MAX_QUEUE", "256"))
+# Per-stage timeouts in seconds
+EMBED_TIMEOUT_S = float(os.getenv("EMBED_TIMEOUT_S", "10"))
+MODEL_TIMEOUT_S = float(os.getenv("MODEL_TIMEOUT_S", "10"))
+# Retry-After value sent with 503 responses
+RETRY_AFTER_S = int(os.getenv("RETRY_AFTER_S", "1"))
+
+# --------- SYMPTOM ENCODER ---------
+# "torch" (fp32 PyTorch), "onnx" (ONNX Runtime fp32) or "onnx-int8" (dynamic INT8 quantization)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Where exported / quantized ONNX models are written
+ONNX_DIR = os.getenv("ONNX_DIR", "onnx_encoder")
+
+# --------- TRAINING FEATURES ---------
+# Texts per forward pass when embedding training data
+EMBED_TRAIN_BATCH_SIZE = int(os.getenv("EMBED_TRAIN_BATCH_SIZE", "64"))
+# In-memory cache entries for the offline encoder (feature stores, training, benchmarks);
+# ~3 KB each, kept small so building a feature store stays bounded (0 = no cache)
+EMBED_OFFLINE_CACHE_SIZE = int(os.getenv("EMBED_OFFLINE_CACHE_SIZE", "1024"))
+# CSV rows read, embedded and written per chunk when building a feature store
+FEATURE_CHUNK_ROWS = int(os.getenv("FEATURE_CHUNK_ROWS", "1000"))
+# On-disk float32 feature matrices, keyed by dataset hash and encoder
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "feature_store")
+
+# --------- TRAINING ---------
+# Cores for the RandomForest and XGBoost trainers when they run side by side
+# (0 = split the machine's cores between them)
+RF_N_JOBS = int(os.getenv("RF_N_JOBS", "0"))
+XGB_NTHREAD = int(os.getenv("XGB_NTHREAD", "0"))
+# Score the training set after fitting (only needed to print the training loss)
+TRAIN_SCORE = os.getenv("TRAIN_SCORE", "0") == "1"
+
+# --------- MODEL BUNDLE ---------
+# Directory written by training.py; the service falls back to risk_model.pkl/xg.pkl without it
+MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR", "model_bundle")
+# Poll MODEL_BUNDLE_DIR/manifest.json every N seconds and hot-reload a new bundle (0 = off)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", "0"))
+# POST /admin/reload is enabled only when this is set, and requires it in the X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# --------- LATENCY SPANS ---------
+# Time every stage of a prediction into /metrics (0 = spans are no-ops)
+STAGE_TIMING = os.getenv("STAGE_TIMING", "1") == "1"
+# Spans per stage kept for the p50/p95/p99 on /metrics
+STAGE_TIMING_WINDOW = int(os.getenv("STAGE_TIMING_WINDOW", "1024"))
+
+# --------- PREDICTION CACHE ---------
+# /predict responses kept per (model version, canonical payload); 0 disables the cache
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+# Seconds a cached response stays valid (0 = until evicted or the model is reloaded)
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "300"))
+
+# --------- MULTI-WORKER SERVING ---------
+# Used by gunicorn_conf.py (gunicorn -c gunicorn_conf.py full_model:app)
+SERVE_BIND = os.getenv("SERVE_BIND", "0.0.0.0:8000")
+# Worker processes. Thread budgets are sized from this, so set it (or WEB_CONCURRENCY, which
+# uvicorn --workers also defaults to) instead of passing gunicorn -w / uvicorn --workers
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+# Load models once in the gunicorn master and fork workers that share them (0 = each worker loads its own)
+SERVE_PRELOAD = os.getenv("SERVE_PRELOAD", "1") == "1"
+
+# --------- THREAD BUDGETS ---------
+# CPU threads each serving worker may use, split between the encoder and the model pool
+# (0 = the cores this process may run on / SERVE_WORKERS, -1 = leave every library at its default)
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "0"))
+# Torch encoder graph: "eager", "torchscript" (traced per padded length at warm-up)
+# or "compile" (torch.compile, compiled at warm-up)
+ENCODER_COMPILE = os.getenv("ENCODER_COMPILE", "eager")
+
+# --------- PRIORITY SCHEDULING ---------
+# Queued embedding and model work runs most urgent first (vitals pre-score, urgency.py).
+# A job counts as one level more urgent for every PRIORITY_AGING_S seconds it has waited,
+# so low-acuity requests are delayed but never starved (0 = first come, first served)
+PRIORITY_AGING_S = float(os.getenv("PRIORITY_AGING_S", "0.5"))
+
+# --------- RULE CASCADE ---------
+# Answer from the vitals-only rule tree (cascade.py) when the rule a patient falls under was
+# right about the (risk, department) pair for at least this share of training patients (0 = off)
+CASCADE_CONFIDENCE = float(os.getenv("CASCADE_CONFIDENCE", "0"))
+# Written by training.py or `python cascade.py`
+CASCADE_PATH = os.getenv("CASCADE_PATH", "cascade.pkl")
+# Deeper trees give more specific rules; each rule covers at least CASCADE_MIN_LEAF training rows
+CASCADE_MAX_DEPTH = int(os.getenv("CASCADE_MAX_DEPTH", "6"))
+CASCADE_MIN_LEAF = int(os.getenv("CASCADE_MIN_LEAF", "50"))
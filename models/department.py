@@ -3,7 +3,12 @@ import xgboost as xgb
 import pickle
 
 
-def train_and_predict_xgb(X_train, y_train, use_gpu=False):
+def train_and_predict_xgb(X_train, y_train, use_gpu=False, nthread=None, score_train=False):
+    """
+    Train the department XGBoost model.
+    nthread: CPU threads for training (None = all cores)
+    score_train: also return predict_proba on the training set (None otherwise)
+    """
 
 
     model = xgb.XGBClassifier(
@@ -27,6 +32,8 @@ def train_and_predict_xgb(X_train, y_train, use_gpu=False):
         tree_method="hist",
 device="cuda" if use_gpu else "cpu",
 
+        n_jobs=nthread,
+
         
     )
     print("Training XGBoost model... in ","cuda" if use_gpu else "cpu")
@@ -39,5 +46,5 @@ device="cuda" if use_gpu else "cpu",
     pickle.dump(model, open("xg.pkl", "wb"))
 
     
-    probs = model.predict_proba(X_train)
+    probs = model.predict_proba(X_train) if score_train else None
     return probs, model
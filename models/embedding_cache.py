@@ -0,0 +1,235 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+try:
+    import fcntl
+except ImportError:   # Windows: disk store works, but without cross-process locking
+    fcntl = None
+
+
+CACHE_LOOKUPS = {
+    tier: metrics.counter(
+        "embedding_cache_lookups_total",
+        "Embedding cache lookups by result",
+        labels={"result": tier}
+    )
+    for tier in ("memory_hit", "disk_hit", "miss")
+}
+
+
+def normalize_text(text):
+    """Collapse whitespace; the tokenizer ignores it, so the embedding is unchanged."""
+    return " ".join(str(text).split())
+
+
+def cache_key(namespace, text):
+    return hashlib.sha1(
+        f"{namespace}\0{normalize_text(text)}".encode("utf-8")
+    ).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU with optional per-entry TTL (seconds)."""
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only on-disk store shared by every worker on the host.
+
+    vectors.f32 is a float32 matrix (one row per key) read through np.memmap,
+    keys.txt holds the matching hex keys one per line. Writers hold an
+    exclusive flock; readers only ever see rows whose key line is complete.
+    """
+
+    def __init__(self, directory, namespace, dim):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace)
+        self.directory = os.path.join(directory, slug)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.dim = dim
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.keys_path = os.path.join(self.directory, "keys.txt")
+        self.lock_path = os.path.join(self.directory, ".lock")
+
+        self._index = {}
+        self._keys_offset = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Pick up rows appended by this or other processes."""
+        try:
+            size = os.path.getsize(self.keys_path)
+        except FileNotFoundError:
+            return
+        if size == self._keys_offset:
+            return
+
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            chunk = f.read()
+        # Ignore a trailing line that is still being written
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            self._index[line.decode("ascii")] = len(self._index)
+        self._keys_offset += len(complete)
+
+        if self._index:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r",
+                shape=(len(self._index), self.dim)
+            )
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present on disk."""
+        with self._lock:
+            self._refresh()
+            return {
+                key: np.array(self._matrix[self._index[key]])
+                for key in keys if key in self._index
+            }
+
+    def put_many(self, items):
+        """items: list of (key, vector) pairs."""
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                new = {key: vec for key, vec in items if key not in self._index}
+                if not new:
+                    return
+
+                with open(self.vectors_path, "ab") as f:
+                    # Drop rows left behind by a writer that died before its keys landed
+                    f.truncate(len(self._index) * self.dim * 4)
+                    f.write(np.asarray(list(new.values()), dtype=np.float32).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self.keys_path, "a") as f:
+                    f.write("".join(key + "\n" for key in new))
+
+                self._refresh()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for symptom embeddings keyed by normalized text.
+
+    Keys are namespaced by model name (plus an optional version string), so
+    swapping the encoder never serves vectors computed by the old one.
+    """
+
+    def __init__(self, model_name, dim, max_size=10000, ttl=None,
+                 disk_dir=None, version=""):
+        self.namespace = f"{model_name}@{version}" if version else model_name
+        self.memory = LRUCache(max_size, ttl)
+        self.disk = DiskEmbeddingStore(disk_dir, self.namespace, dim) if disk_dir else None
+        # Engines are called from the event loop and from pool threads
+        self._counts_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, text_list):
+        """
+        returns: (found, missing) where found maps position -> vector and
+        missing lists the positions that still need a forward pass
+        """
+        keys = [cache_key(self.namespace, text) for text in text_list]
+        found = {}
+        pending = []
+        for i, key in enumerate(keys):
+            vector = self.memory.get(key)
+            if vector is None:
+                pending.append(i)
+            else:
+                found[i] = vector
+        CACHE_LOOKUPS["memory_hit"].inc(len(found))
+
+        if pending and self.disk is not None:
+            on_disk = self.disk.get_many([keys[i] for i in pending])
+            still_missing = []
+            for i in pending:
+                vector = on_disk.get(keys[i])
+                if vector is None:
+                    still_missing.append(i)
+                else:
+                    found[i] = vector
+                    self.memory.put(keys[i], vector)
+            CACHE_LOOKUPS["disk_hit"].inc(len(pending) - len(still_missing))
+            pending = still_missing
+
+        CACHE_LOOKUPS["miss"].inc(len(pending))
+        with self._counts_lock:
+            self.hits += len(found)
+            self.misses += len(pending)
+        return found, pending
+
+    def store(self, text_list, vectors):
+        # Copy each row: a slice of the encoder output would keep the whole batch alive
+        items = [
+            (cache_key(self.namespace, text), np.array(vec, dtype=np.float32, copy=True))
+            for text, vec in zip(text_list, vectors)
+        ]
+        for key, vector in items:
+            self.memory.put(key, vector)
+        if self.disk is not None:
+            self.disk.put_many(items)
+
+    def stats(self):
+        with self._counts_lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": hits,
+            "misses": misses,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else None,
+        }
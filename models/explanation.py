@@ -1,120 +1,299 @@
 import numpy as np
-import shap
-from sklearn.metrics import accuracy_score
+import xgboost as xgb
+from scipy import sparse
 import pandas as pd
 
+import timing
+from config import EXPLANATION_BACKEND, EXPLANATION_MODE
+from forest_engine import FlatForest
 
-def predict_with_explanation(
-    model,
-    X_test,                # shape (n_samples, n_features)
-    y_true,                # true labels
-    feature_names,
-    top_k=3
-):
 
-    # ---- Predictions ----
-    preds = model.predict(X_test)
+SYMPTOM_TEXT = "Symptom text"
 
-    # ---- Accuracy (based only on predictions) ----
-    accuracy = accuracy_score(y_true, preds)
 
-    # ---- SHAP Explainer (create once) ----
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X_test)
+def feature_groups(feature_names):
+    """
+    Map every model column to an explanation group.
+    Structured features stand alone; the emb_* block collapses into one
+    "Symptom text" group because individual embedding dimensions mean nothing
+    to a clinician.
 
-    explanations = []
+    returns: (group_names, group_index) where group_index[i] is the group of column i
+    """
+    group_names = []
+    group_index = []
+    for name in feature_names:
+        group = SYMPTOM_TEXT if name.startswith("emb_") else name
+        if group not in group_names:
+            group_names.append(group)
+        group_index.append(group_names.index(group))
+    return group_names, np.array(group_index)
 
-    for i in range(len(X_test)):
 
-        # Select correct class (binary/multiclass safe)
-        if isinstance(shap_values, list):
-            contrib = shap_values[preds[i]][i]
+class _Explainer:
+    """
+    Common base: contributions() returns (n_samples, n_outputs, n_classes)
+    where the outputs are either the model columns or their groups.
+    """
+
+    def __init__(self, model, grouped):
+        feature_names = list(model.feature_names_in_)
+        if grouped:
+            self.output_names, self.group_index = feature_groups(feature_names)
         else:
-            contrib = shap_values[i]
-
-        # Get top positive contributors
-        indices = np.argsort(contrib)[::-1]
-
-        selected = []
-        for idx in indices:
-            if contrib[idx] > 0:
-                selected.append(
-                    (feature_names[idx], X_test[i][idx])
-                )
-            if len(selected) == top_k:
-                break
+            self.output_names, self.group_index = feature_names, None
 
-        features_text = [
-            f"{f[0]} ({f[1]})" for f in selected
-        ]
+    def _group(self, contribs):
+        if self.group_index is None:
+            return contribs
+        indicator = np.zeros((len(self.group_index), len(self.output_names)))
+        indicator[np.arange(len(self.group_index)), self.group_index] = 1.0
+        return np.einsum("nfc,fg->ngc", contribs, indicator)
 
-        explanation = (
-            f"Prediction influenced mainly by: "
-            f"{', '.join(features_text)}."
-        )
 
-        explanations.append(explanation)
+class ShapExplainer(_Explainer):
+    """
+    TreeSHAP from the shap package: the reference backend, and the fast backend
+    for forests. shap is slow to import, so it is only imported when needed.
+    """
+
+    def __init__(self, model, grouped=False):
+        import shap
+
+        super().__init__(model, grouped)
+        self.explainer = shap.TreeExplainer(model)
+
+    def contributions(self, X):
+        shap_values = self.explainer.shap_values(X)
+
+        # ---- Handle Different SHAP Output Formats ----
+        if isinstance(shap_values, list):
+            # Old style multiclass: one (samples, features) array per class
+            return self._group(np.stack(shap_values, axis=-1))
+
+        shap_values = np.array(shap_values)
+        if len(shap_values.shape) == 2:
+            # (samples, features)
+            return self._group(shap_values[:, :, None])
+        # (samples, features, classes)
+        return self._group(shap_values)
+
+
+class XGBoostContribExplainer(_Explainer):
+    """Fast backend for XGBoost: exact TreeSHAP computed natively (pred_contribs)."""
+
+    def __init__(self, model, grouped=False):
+        super().__init__(model, grouped)
+        self.booster = model.get_booster()
+
+    def contributions(self, X):
+        dmatrix = xgb.DMatrix(
+            X,
+            feature_names=None if isinstance(X, pd.DataFrame) else self.booster.feature_names
+        )
+        contribs = self.booster.predict(dmatrix, pred_contribs=True)
 
-    return preds, accuracy, explanations
+        if contribs.ndim == 2:
+            # (samples, features + 1) for binary / single output
+            contribs = contribs[:, None, :]
+        # (samples, classes, features + 1) -> drop bias -> (samples, features, classes)
+        return self._group(contribs[:, :, :-1].transpose(0, 2, 1))
 
 
-def predict_single_with_explanation(model, X_sample, top_k=5):
+class ForestContribExplainer(_Explainer):
     """
-    Predict for a single sample and return prediction + explanation.
-    X_sample must be shape (1, n_features).
+    Approximate backend for sklearn forests: path-based (Saabas) contributions.
+
+    Every node stores how much the class distribution moved when its parent
+    split, attributed to the parent's split feature. Summing that table along
+    a sample's decision paths and averaging over trees gives additive
+    contributions (bias + sum == predict_proba). This is not TreeSHAP: only
+    features on the path actually taken are credited, so individual values
+    can differ from the SHAP values by a large fraction and even in sign.
+    Use it only where per-row TreeSHAP on a deep forest is too slow.
+
+    When grouped, the table is built directly over the groups, so embedding
+    columns are never materialized individually.
+
+    forest: optional FlatForest for the same model. The table is then summed
+    along every root-to-leaf path up front, and a sample's contributions are
+    just its leaves' rows, found with the flat engine instead of sklearn's
+    decision_path. model may itself be a FlatForest (e.g. memory-mapped from
+    a bundle), in which case the sklearn model is never needed.
     """
 
-    # Ensure DataFrame with correct feature names
-    if not isinstance(X_sample, pd.DataFrame):
-        X_sample = pd.DataFrame(
-            X_sample,
-            columns=model.feature_names_in_
-        )
+    def __init__(self, model, grouped=False, forest=None):
+        super().__init__(model, grouped)
+        self.model = model
+        if forest is None and isinstance(model, FlatForest):
+            forest = model
+        self.forest = forest
+        # The table is indexed by flat node id, which is also decision_path's column order
+        flat = forest if forest is not None else FlatForest.from_sklearn(model)
+        n_outputs = len(self.output_names)
+        n_classes = len(model.classes_)
+        if self.group_index is None:
+            column_of = np.arange(model.n_features_in_)
+        else:
+            column_of = self.group_index
 
-    # ---- Prediction ----
-    pred = model.predict(X_sample)[0]
+        values = flat.value
+        splits = np.flatnonzero(~flat.is_leaf)
+        column = column_of[flat.feature[splits]]
+        parent = np.full(len(flat.is_leaf), -1)
+        rows, cols, vals = [], [], []
+        for side in (0, 1):
+            kids = flat.children[2 * splits + side]
+            parent[kids] = splits
+            delta = values[kids] - values[splits]
 
-    # ---- SHAP Explainer ----
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X_sample)
+            rows.append(np.repeat(kids, n_classes))
+            cols.append((column[:, None] * n_classes + np.arange(n_classes)).ravel())
+            vals.append(delta.ravel())
 
-    # ---- Handle Different SHAP Output Formats ----
-    if isinstance(shap_values, list):
-        # Old style multiclass
-        contrib = shap_values[pred][0]
-    else:
-        shap_values = np.array(shap_values)
+        # Duplicate (node, group) entries are summed by the CSR constructor
+        self.table = sparse.csr_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(parent), n_outputs * n_classes)
+        )
+        self.expected_value = values[flat.roots].mean(axis=0)
+        self.n_trees = flat.n_trees
+        self.n_outputs = n_outputs
+        self.n_classes = n_classes
+        if forest is not None:
+            self.table = self._path_sums(parent) @ self.table
+
+    @staticmethod
+    def _path_sums(parent):
+        """(node, ancestor-or-self) indicator, so row i of result @ table sums node i's path."""
+        nodes = np.arange(len(parent))
+        rows, cols = [nodes], [nodes]
+        ancestor = parent
+        while True:
+            has = ancestor != -1
+            if not has.any():
+                break
+            rows.append(nodes[has])
+            cols.append(ancestor[has])
+            nodes, ancestor = nodes[has], parent[ancestor[has]]
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(parent), len(parent))
+        )
 
-        if len(shap_values.shape) == 3:
-            # (samples, features, classes)
-            contrib = shap_values[0, :, pred]
+    def contributions(self, X):
+        n_trees = self.n_trees
+        if self.forest is None:
+            paths, _ = self.model.decision_path(X)
         else:
-            # (samples, features)
-            contrib = shap_values[0]
+            # One leaf per tree per sample; its row already holds the whole path
+            leaves = self.forest.apply(X).ravel()
+            paths = sparse.csr_matrix(
+                (np.ones(len(leaves)), leaves, np.arange(0, len(leaves) + 1, n_trees)),
+                shape=(len(X), self.table.shape[0])
+            )
+        contribs = np.asarray((paths @ self.table).todense()) / n_trees
+        return contribs.reshape(len(X), self.n_outputs, self.n_classes)
 
-    contrib = np.array(contrib).flatten()
 
+def build_explainer(model, backend=EXPLANATION_BACKEND, mode=EXPLANATION_MODE, forest=None):
+    """
+    Build the explainer for a tree model.
+    Walking every tree is expensive, so build it once per loaded model and reuse it.
+
+    backend: "fast" computes exact TreeSHAP natively for XGBoost and with the
+             shap package for forests; "approximate" is "fast" with path-based
+             forest contributions instead (ForestContribExplainer, not SHAP
+             values); "shap" always uses the shap package (the reference).
+    mode: "structured" attributes over the six structured features plus one
+          symptom-text group, "full" over every model column.
+    forest: FlatForest of a RandomForest model, used by the approximate backend to walk the trees
+    """
+    if mode not in ("structured", "full"):
+        raise ValueError(f"Unknown explanation mode: {mode}")
+    grouped = mode == "structured"
+
+    if backend in ("fast", "approximate"):
+        if isinstance(model, xgb.XGBModel):
+            return XGBoostContribExplainer(model, grouped)
+        if backend == "approximate" and (isinstance(model, FlatForest) or (
+            hasattr(model, "estimators_") and hasattr(model, "decision_path")
+        )):
+            return ForestContribExplainer(model, grouped, forest)
+    elif backend != "shap":
+        raise ValueError(f"Unknown explanation backend: {backend}")
+    if isinstance(model, FlatForest):
+        raise ValueError(
+            "TreeSHAP needs the sklearn model, not its FlatForest "
+            "(only the approximate backend explains a FlatForest)"
+        )
+    return ShapExplainer(model, grouped)
+
+
+def _format_explanation(names, contrib, top_k):
     # ---- Get Top Positive Features ----
+    # Individual emb_* columns (EXPLANATION_MODE=full) are never reported, so they
+    # must not take any of the top_k slots either
     indices = np.argsort(contrib)[::-1]
 
     selected = []
 
     for idx in indices:
-        if contrib[idx] > 0:
-            feature_name = model.feature_names_in_[idx]
+        if contrib[idx] > 0 and not names[idx].startswith("emb_"):
             selected.append(
-                (feature_name, float(contrib[idx]))
+                (names[idx], float(contrib[idx]))
             )
         if len(selected) == top_k:
             break
 
     # ---- Format Explanation ----
     if selected:
-        explanation = "Top contributing features: " + ", ".join(
-            [f"{name} ({round(value,4)})" for name, value in selected if not name.startswith("emb")]
+        return "Top contributing features: " + ", ".join(
+            [f"{name} ({round(value,4)})" for name, value in selected]
         )
-    else:
-        explanation = "No significant positive contributing features found."
+    return "No significant positive contributing features found."
 
-    return pred, explanation
 
+def predict_batch_with_explanation(model, X, top_k=5, explainer=None, predictor=None,
+                                   stage="model"):
+    """
+    Predict for many samples at once and return predictions + explanations.
+    Prediction and contributions are computed in one vectorized call each;
+    only the text formatting is per row.
+    predictor: drop-in for model.predict (e.g. a FlatForest of the model)
+    stage: prefix of the timing spans (<stage>_predict, <stage>_explain)
+    """
+
+    # Ensure DataFrame with correct feature names
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(
+            X,
+            columns=model.feature_names_in_,
+            copy=False
+        )
+
+    # ---- Prediction ----
+    with timing.span(f"{stage}_predict"):
+        preds = (model if predictor is None else predictor).predict(X)
+
+    # ---- Feature Contributions ----
+    with timing.span(f"{stage}_explain"):
+        if explainer is None:
+            explainer = build_explainer(model)
+        contribs = explainer.contributions(X)[np.arange(len(X)), :, preds]
+
+        explanations = [
+            _format_explanation(explainer.output_names, contrib, top_k)
+            for contrib in contribs
+        ]
+    return preds, explanations
+
+
+def predict_single_with_explanation(model, X_sample, top_k=5, explainer=None):
+    """
+    Predict for a single sample and return prediction + explanation.
+    X_sample must be shape (1, n_features).
+    explainer: cached result of build_explainer(model); built on the fly if omitted.
+    """
+    preds, explanations = predict_batch_with_explanation(model, X_sample, top_k, explainer)
+    return preds[0], explanations[0]
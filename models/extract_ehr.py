@@ -61,20 +61,22 @@ def extract_advanced_clinical_data(file_path):
         return f"An unexpected error occurred: {e}"
 
 
-file_input = 'your_new_ehr_file.csv' 
+if __name__ == "__main__":
 
+    file_input = 'your_new_ehr_file.csv' 
 
-if os.path.exists(file_input):
-    
-    clinical_data = extract_advanced_clinical_data(file_input)
-    
-    if isinstance(clinical_data, pd.DataFrame):
 
-        print(f"Successfully extracted {len(clinical_data)} records.")
+    if os.path.exists(file_input):
 
-        print(clinical_data.head())
-        
-        
-        clinical_data.to_csv('extracted_vitals_report.csv', index=False)
-else:
-    print(f"Please place '{file_input}' in the folder or update the file_input variable.")
\ No newline at end of file
+        clinical_data = extract_advanced_clinical_data(file_input)
+
+        if isinstance(clinical_data, pd.DataFrame):
+
+            print(f"Successfully extracted {len(clinical_data)} records.")
+
+            print(clinical_data.head())
+
+
+            clinical_data.to_csv('extracted_vitals_report.csv', index=False)
+    else:
+        print(f"Please place '{file_input}' in the folder or update the file_input variable.")
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from config import EMBEDDING_BACKEND, FEATURE_CHUNK_ROWS, FEATURE_STORE_DIR
+from featurize import embed_unique, file_hash
+from features import FEATURE_COLUMNS, assemble_features
+from to_embeddings import MODEL_NAME, get_default_engine
+
+
+LABEL_COLUMNS = ("Risk_Level", "Department")
+
+
+def iter_feature_chunks(csv_path, chunksize=FEATURE_CHUNK_ROWS, label_columns=LABEL_COLUMNS):
+    """
+    Stream a triage CSV as model-ready chunks.
+    Yields (X_chunk, labels_chunk) where X_chunk is a float32 (rows, 774) matrix
+    and labels_chunk maps each present label column to its values.
+    Only one chunk of rows, tokens and hidden states is in memory at a time.
+    """
+    engine = get_default_engine()
+    misses_before = engine.cache.misses if engine.cache is not None else 0
+    # keep_default_na=False keeps the literal "None" condition as a string
+    reader = pd.read_csv(csv_path, chunksize=chunksize, keep_default_na=False)
+    done = 0
+    distinct = 0
+    for chunk in reader:
+        # Symptom sentences repeat heavily: embed each distinct one once per chunk
+        # (the engine's cache also skips those already seen in earlier chunks)
+        embeddings, n_unique = embed_unique(
+            engine, chunk["Symptoms"].tolist(),
+            label=f"Embedding {csv_path} rows {done}-{done + len(chunk)}"
+        )
+        X_chunk = assemble_features(chunk, embeddings)
+        labels = {col: chunk[col].to_numpy() for col in label_columns if col in chunk.columns}
+        done += len(chunk)
+        distinct += n_unique
+        yield X_chunk, labels
+
+    embedded = engine.cache.misses - misses_before if engine.cache is not None else distinct
+    print(
+        f"{csv_path}: {done} rows, {embedded} texts run through the encoder "
+        f"(dedup ratio {done / max(embedded, 1):.1f}x)"
+    )
+
+
+class FeatureStore:
+    """
+    Read-only view of a feature store directory:
+    features.f32 (rows x FEATURE_COLUMNS, float32, memory-mapped),
+    one <label>.npy per label column and meta.json.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["columns"] != FEATURE_COLUMNS:
+            raise ValueError(f"Feature store {directory} has a different column layout")
+
+        self.directory = directory
+        self.X = np.memmap(
+            os.path.join(directory, "features.f32"), dtype=np.float32, mode="r",
+            shape=(self.meta["rows"], len(FEATURE_COLUMNS))
+        )
+        self.labels = {
+            col: np.load(os.path.join(directory, f"{col}.npy"), mmap_mode="r")
+            for col in self.meta["labels"]
+        }
+
+    def __len__(self):
+        return self.meta["rows"]
+
+
+def build_feature_store(csv_path, store_root=FEATURE_STORE_DIR, chunksize=FEATURE_CHUNK_ROWS):
+    """
+    Featurize csv_path chunk by chunk, appending to an on-disk float32 matrix.
+    The store is keyed by the CSV content hash and the encoder, so an existing
+    store for the same data and model is reused without running BERT.
+    Peak memory is bounded by chunksize, not by the size of the dataset.
+    """
+    encoder = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{MODEL_NAME}-{EMBEDDING_BACKEND}")
+    directory = os.path.join(store_root, f"{file_hash(csv_path)}-{encoder}")
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        print(f"Reusing feature store {directory}")
+        return FeatureStore(directory)
+
+    os.makedirs(directory, exist_ok=True)
+    rows = 0
+    labels = {}
+    with open(os.path.join(directory, "features.f32"), "wb") as f:
+        for X_chunk, label_chunk in iter_feature_chunks(csv_path, chunksize):
+            f.write(X_chunk.tobytes())
+            rows += len(X_chunk)
+            # Labels are one value per row (vs 774 floats), so they are gathered in memory
+            for col, values in label_chunk.items():
+                labels.setdefault(col, []).append(values)
+
+    for col, parts in labels.items():
+        values = np.concatenate(parts)
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(directory, f"{col}.npy"), values)
+
+    # meta.json is written last: its presence marks the store as complete
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({
+            "source": csv_path,
+            "encoder": f"{MODEL_NAME}/{EMBEDDING_BACKEND}",
+            "rows": rows,
+            "columns": FEATURE_COLUMNS,
+            "labels": list(labels)
+        }, f)
+    return FeatureStore(directory)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+# Column layout shared by training and serving.
+STRUCTURED_FEATURES = [
+    "Age",
+    "Gender",
+    "Blood_Pressure",
+    "Heart_Rate",
+    "Temperature",
+    "Pre-Existing_Conditions"
+]
+EMBEDDING_DIM = 768
+FEATURE_COLUMNS = STRUCTURED_FEATURES + [f"emb_{i}" for i in range(EMBEDDING_DIM)]
+
+# Codes the shipped models were trained with (LabelEncoder order over the CSV values)
+PRE_EXISTING_CODES = {
+    "Cardiac Issue": 0,
+    "Heart Disease": 1,
+    "Hypertension": 2,
+    "None": 3
+}
+GENDER_CODES = {
+    "Male": 0,
+    "Female": 1
+}
+
+
+def encode_gender(value):
+    """Accepts 'Male'/'Female' (API) or an already encoded 0/1 (CSV)."""
+    if value in GENDER_CODES:
+        return GENDER_CODES[value]
+    if value in (0, 1):
+        return int(value)
+    raise ValueError(f"Unknown Gender: {value!r}")
+
+
+def encode_pre_existing(value):
+    if isinstance(value, str) and value in PRE_EXISTING_CODES:
+        return PRE_EXISTING_CODES[value]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        # pandas reads the literal "None" as NaN unless keep_default_na=False
+        return PRE_EXISTING_CODES["None"]
+    raise ValueError(
+        f"Unknown Pre-Existing_Conditions: {value!r} "
+        f"(expected one of {', '.join(PRE_EXISTING_CODES)})"
+    )
+
+
+def allocate(n_rows):
+    """Uninitialized float32 buffer for n_rows full feature rows."""
+    return np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+
+
+def write_structured(records, out):
+    """
+    Write the structured block (first len(STRUCTURED_FEATURES) columns) into out.
+    records: DataFrame with the raw CSV columns, or list of dicts from the API
+    """
+    if isinstance(records, pd.DataFrame):
+        out[:, 0] = records["Age"].to_numpy()
+        out[:, 1] = records["Gender"].map(encode_gender).to_numpy()
+        out[:, 2] = records["Blood_Pressure"].to_numpy()
+        out[:, 3] = records["Heart_Rate"].to_numpy()
+        out[:, 4] = records["Temperature"].to_numpy()
+        out[:, 5] = records["Pre-Existing_Conditions"].map(encode_pre_existing).to_numpy()
+        return out
+
+    for row, record in zip(out, records):
+        row[0] = record["Age"]
+        row[1] = encode_gender(record["Gender"])
+        row[2] = record["Blood_Pressure"]
+        row[3] = record["Heart_Rate"]
+        row[4] = record["Temperature"]
+        row[5] = encode_pre_existing(record["Pre-Existing_Conditions"])
+    return out
+
+
+def assemble_features(records, embeddings, out=None):
+    """
+    Build the model input matrix in FEATURE_COLUMNS order.
+
+    records: DataFrame or list of dicts with the structured fields
+    embeddings: (n_rows, EMBEDDING_DIM) array of symptom CLS vectors
+    out: optional preallocated buffer from allocate(); written in place
+    returns: (n_rows, len(FEATURE_COLUMNS)) float32 array
+    """
+    n_rows = len(embeddings)
+    if out is None:
+        out = allocate(n_rows)
+    n_structured = len(STRUCTURED_FEATURES)
+    write_structured(records, out[:n_rows, :n_structured])
+    out[:n_rows, n_structured:] = embeddings
+    return out[:n_rows]
+
+
+def as_frame(X):
+    """Wrap a feature matrix with column names (no copy) for the sklearn/XGBoost models."""
+    return pd.DataFrame(X, columns=FEATURE_COLUMNS, copy=False)
@@ -0,0 +1,53 @@
+import hashlib
+
+import numpy as np
+
+from config import EMBED_TRAIN_BATCH_SIZE
+from features import EMBEDDING_DIM
+
+
+def file_hash(path):
+    """Short content hash of a dataset file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def embed_texts(engine, texts, batch_size=EMBED_TRAIN_BATCH_SIZE, label="Embedding", progress=True):
+    """
+    Embed texts in fixed-size mini-batches into one preallocated float32 matrix,
+    so peak memory is bounded by batch_size instead of len(texts).
+    """
+    out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for start in range(0, len(texts), batch_size):
+        stop = min(start + batch_size, len(texts))
+        out[start:stop] = engine.embed(texts[start:stop]).cpu().numpy()
+        if progress:
+            print(f"\r{label}: {stop}/{len(texts)}", end="", flush=True)
+    if progress:
+        print()
+    return out
+
+
+def embed_unique(engine, texts, batch_size=EMBED_TRAIN_BATCH_SIZE, label="Embedding", progress=True):
+    """
+    Embed only the distinct texts and scatter the vectors back by index.
+    Distinct texts are ordered by length so each mini-batch pads to similar
+    lengths instead of to the longest sentence in a random mix.
+
+    returns: (embeddings, n_unique) with embeddings aligned to texts
+    """
+    index = {}
+    inverse = np.fromiter(
+        (index.setdefault(text, len(index)) for text in texts),
+        dtype=np.int64, count=len(texts)
+    )
+    unique = list(index)
+    order = sorted(range(len(unique)), key=lambda i: len(unique[i]))
+
+    vectors = embed_texts(engine, [unique[i] for i in order], batch_size, label, progress)
+    unique_vectors = np.empty_like(vectors)
+    unique_vectors[order] = vectors
+    return unique_vectors[inverse], len(unique)
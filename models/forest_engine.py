@@ -0,0 +1,176 @@
+import os
+
+import numpy as np
+
+
+class FlatForest:
+    """
+    RandomForestClassifier exported to contiguous arrays for low-latency inference.
+
+    Every tree is appended to one node table, so a batch walks all trees at
+    once: each step is a handful of NumPy gathers over the (sample, tree)
+    pairs still in flight, instead of one sklearn call per tree.
+
+    predict_proba() is bit-identical to the sklearn model evaluated with
+    n_jobs=1: same float32 inputs, same float64 comparisons, same leaf values
+    summed in tree order, same final division.
+    """
+
+    # Arrays written by save() and memory-mapped back by load(); missing_right is optional
+    ARRAYS = ("feature", "threshold32", "children", "is_leaf", "missing_right", "value", "roots",
+              "classes_")
+
+    def __init__(self, feature, threshold, children, is_leaf, missing_right, value, roots,
+                 classes, feature_names, threshold32=None):
+        self.feature = feature              # (n_nodes,) split column, 0 for leaves
+        self.threshold = threshold          # (n_nodes,) float64 split value, or None if loaded
+        if threshold32 is None:
+            # Inputs are float32, so x <= t holds exactly when x <= the largest
+            # float32 not above t: comparing in float32 gives the same branches
+            threshold32 = threshold.astype(np.float32)
+            above = threshold32 > threshold
+            threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        self.threshold32 = threshold32
+        self.children = children            # (n_nodes * 2,) [left, right] per node
+        self.is_leaf = is_leaf              # (n_nodes,) bool
+        self.missing_right = missing_right  # (n_nodes,) where NaN goes, or None
+        self.value = value                  # (n_nodes, n_classes) float64 class fractions
+        self.roots = roots                  # (n_trees,) root node of each tree
+        self.classes_ = classes
+        self.feature_names_in_ = feature_names
+        self.n_features_in_ = len(feature_names)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, children, leaves, missing, values, roots = [], [], [], [], [], [], []
+        n_classes = len(model.classes_)
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            feature = np.where(leaf, 0, tree.feature)
+            left = np.where(leaf, nodes, tree.children_left) + offset
+            right = np.where(leaf, nodes, tree.children_right) + offset
+
+            value = tree.value[:, 0, :n_classes]
+            # sklearn < 1.4 stores weighted class counts and normalizes at predict time;
+            # newer versions store the fractions directly
+            normalizer = value.sum(axis=1, keepdims=True)
+            if normalizer.max() > 1 + 1e-6:
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            children.append(np.stack([left, right], axis=1).ravel())
+            leaves.append(leaf)
+            missing_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(None if missing_left is None else missing_left == 0)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(children).astype(np.intp),
+            np.concatenate(leaves),
+            None if any(m is None for m in missing) else np.concatenate(missing),
+            np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            np.array(roots, dtype=np.intp),
+            model.classes_,
+            list(model.feature_names_in_),
+        )
+
+    def save(self, directory):
+        """
+        Write every array as <directory>/<name>.npy; returns {name: path}.
+        Each file is written beside its target and renamed over it, so a process
+        still mapping the previous forest keeps reading intact pages.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            if array is None:
+                continue
+            path = os.path.join(directory, f"{name}.npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(path + ".tmp", path)
+            paths[name] = path
+        return paths
+
+    @classmethod
+    def load(cls, paths, feature_names, mmap_mode="r"):
+        """
+        Rebuild a forest from the files save() wrote (paths: {name: path}).
+        With mmap_mode="r" nothing is copied: the arrays are read-only views of
+        the page cache, shared by every process that maps the same files.
+        """
+        arrays = {name: None for name in cls.ARRAYS}
+        for name, path in paths.items():
+            arrays[name] = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        classes = arrays.pop("classes_")
+        return cls(
+            threshold=None, classes=np.asarray(classes), feature_names=list(feature_names), **arrays
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _as_input(self, X):
+        # sklearn trees evaluate float32 inputs (X is already float32 in the service)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected an (n_samples, {self.n_features_in_}) matrix, got shape {X.shape}"
+            )
+        return X
+
+    def apply(self, X):
+        """Leaf node id (in the flat table) reached in every tree: (n_samples, n_trees)."""
+        X = self._as_input(X)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        has_nan = self.missing_right is not None and np.isnan(X).any()
+
+        leaves = np.empty(n_samples * self.n_trees, dtype=np.intp)
+        pairs = np.arange(n_samples * self.n_trees)
+        nodes = np.tile(self.roots, n_samples)
+        # Flat offset of each (sample, tree) pair's row in X
+        row_start = np.repeat(np.arange(n_samples) * n_features, self.n_trees)
+
+        while True:
+            x = flat_X[row_start + self.feature[nodes]]
+            go_right = x > self.threshold32[nodes]
+            if has_nan:
+                nan = np.isnan(x)
+                go_right[nan] = self.missing_right[nodes[nan]]
+            nodes = self.children[2 * nodes + go_right]
+
+            done = self.is_leaf[nodes]
+            n_done = np.count_nonzero(done)
+            if n_done == len(nodes):
+                leaves[pairs] = nodes
+                return leaves.reshape(n_samples, self.n_trees)
+            # Leaves loop back to themselves, so finished pairs can keep stepping;
+            # drop them only once they are a large share of the work
+            if n_done * 4 >= len(nodes):
+                leaves[pairs[done]] = nodes[done]
+                keep = ~done
+                pairs, nodes, row_start = pairs[keep], nodes[keep], row_start[keep]
+
+    def predict_proba(self, X):
+        leaf_values = self.value[self.apply(X)]   # (n_samples, n_trees, n_classes)
+        # cumsum adds strictly tree by tree, matching sklearn's running sum
+        # (np.sum would use pairwise summation and differ in the last bits)
+        proba = np.cumsum(leaf_values, axis=1)[:, -1]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
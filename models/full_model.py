@@ -1,12 +1,37 @@
-from explanation import predict_single_with_explanation
-import pickle
-from to_embeddings import get_symptom_embedding
-import joblib
+from explanation import build_explainer, predict_batch_with_explanation
+from forest_engine import FlatForest
+from features import EMBEDDING_DIM, GENDER_CODES, PRE_EXISTING_CODES, assemble_features
+from bundle import load_deployed
+from to_embeddings import create_engine, MODEL_NAME
+from embedding_cache import EmbeddingCache
+from batching import EmbeddingBatcher
+from prediction_cache import PredictionCache, prediction_key
+from inference import InferencePool, Overloaded
+from thread_budget import apply_thread_budget, thread_budget
+from urgency import LEVELS, most_urgent, urgency_level
+from cascade import load_cascade
+import metrics
+import timing
+from config import (
+    EMBED_CACHE_SIZE, EMBED_CACHE_TTL_S, EMBED_CACHE_DIR, EMBED_CACHE_VERSION,
+    PREDICT_BATCH_CHUNK_SIZE, EMBED_TIMEOUT_S, MODEL_TIMEOUT_S, RETRY_AFTER_S,
+    EMBEDDING_BACKEND, MODEL_BUNDLE_DIR, MODEL_WATCH_INTERVAL_S, ADMIN_TOKEN, RISK_ENGINE,
+    EXPLANATION_BACKEND,
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S, CASCADE_CONFIDENCE, CASCADE_PATH
+)
+import asyncio
+import gc
+import hmac
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Literal
 import uvicorn
 
 # Initialize FastAPI app
@@ -25,133 +50,609 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+BATCH_TEXTS = metrics.counter(
+    "predict_batch_texts_total",
+    "Symptom texts received on /predict_batch"
+)
+BATCH_DISTINCT_TEXTS = metrics.counter(
+    "predict_batch_distinct_texts_total",
+    "Distinct symptom texts per chunk actually sent to the embedding batcher"
+)
+CASCADE_DECISIONS = {
+    decided_by: metrics.counter(
+        "cascade_decisions_total",
+        "Patients answered by the vitals rule cascade or passed on to the full models",
+        labels={"decided_by": decided_by}
+    )
+    for decided_by in ("rules", "model")
+}
+# End-to-end /predict latency by vitals urgency: under load, "high" should stay flat
+PREDICT_SECONDS = {
+    level: (
+        metrics.histogram(
+            "predict_latency_seconds",
+            "/predict latency by urgency",
+            buckets=timing.STAGE_BUCKETS,
+            labels={"priority": level}
+        ),
+        metrics.summary(
+            "predict_latency_recent_seconds",
+            "p50/p95/p99 of recent /predict latency by urgency",
+            labels={"priority": level}
+        )
+    )
+    for level in LEVELS
+}
+
 # Global model variables
-risk_model = None
-xg_model = None
+# The bundle and its explainers are swapped as one object on reload: a request
+# reads `serving` once and finishes on that version even if a reload lands meanwhile
+serving = None
+embedding_engine = None
+embedding_batcher = None
+inference_pool = None
+prediction_cache = None
+reload_lock = None
+watch_task = None
+# Vitals-only first stage (CASCADE_CONFIDENCE > 0); not part of the bundle, so reloads keep it
+cascade = None
+# CPU threads for this worker's encoder and models (WORKER_THREADS; None = library defaults)
+thread_limits = thread_budget()
+
+MODEL_RELOADS = {
+    result: metrics.counter(
+        "model_reloads_total",
+        "Model bundle reload attempts",
+        labels={"result": result}
+    )
+    for result in ("ok", "failed")
+}
+
+# Synthetic patient for the warm-up prediction run before a bundle takes traffic
+WARMUP_PATIENT = {
+    "Age": 50,
+    "Gender": "Male",
+    "Blood_Pressure": 120,
+    "Heart_Rate": 80,
+    "Temperature": 98.6,
+    "Pre-Existing_Conditions": "None"
+}
+
+
+class ServingModels:
+    """A loaded model bundle plus the explainers built for it."""
+
+    def __init__(self, bundle, threads=None):
+        self.bundle = bundle
+        self.version = bundle.version
+        # The flat engine skips sklearn's per-call validation and per-tree dispatch
+        # for both the prediction and the explanation's tree walk
+        self.risk_predictor = None
+        if RISK_ENGINE == "flat":
+            # Memory-mapped from the bundle, so workers share one copy of the forest
+            self.risk_predictor = bundle.risk_forest
+            if self.risk_predictor is None:
+                self.risk_predictor = FlatForest.from_sklearn(bundle.risk_model)
+        elif RISK_ENGINE != "sklearn":
+            raise ValueError(f"Unknown risk engine: {RISK_ENGINE}")
+        # TreeSHAP needs the sklearn forest itself; only the flat engine with the
+        # approximate explanations never unpickles it
+        if self.risk_predictor is not None and EXPLANATION_BACKEND == "approximate":
+            self.risk_model = self.risk_predictor
+        else:
+            self.risk_model = bundle.risk_model
+        if threads is not None:
+            # Up to INFERENCE_WORKERS predictions run at once; each gets its slice of the budget
+            bundle.department_model.set_params(n_jobs=threads.model)
+            if self.risk_predictor is None:
+                self.risk_model.set_params(n_jobs=threads.model)
+        # Explainers are tied to the model objects; rebuild them whenever models are loaded
+        self.risk_explainer = build_explainer(self.risk_model, forest=self.risk_predictor)
+        self.department_explainer = build_explainer(bundle.department_model)
+
+
+def manifest_stamp():
+    """(mtime, size) of the bundle manifest, or None if there is no bundle."""
+    try:
+        stat = os.stat(os.path.join(MODEL_BUNDLE_DIR, "manifest.json"))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def warm_up_models(models):
+    """
+    One throwaway prediction initializes the predictors and explainer tables,
+    and makes an unusable bundle fail here rather than on live traffic.
+    """
+    output_batch([WARMUP_PATIENT], np.zeros((1, EMBEDDING_DIM), dtype=np.float32), models)
+
+
+def load_serving_models(warm_up=True):
+    """Load the bundle on disk (or the legacy pickles), build its explainers and warm it up."""
+    bundle = load_deployed(MODEL_BUNDLE_DIR)
+    models = ServingModels(bundle, thread_limits)
+    if warm_up:
+        warm_up_models(models)
+    print(f"Loaded model version {bundle.version} in {bundle.load_seconds:.2f}s")
+    return models
+
+
+def load_encoder(warm_up=True):
+    """Build the symptom encoder (imports torch/transformers) and run one warm-up pass."""
+    # Vectors differ between fp32 / ONNX / INT8 encoders, so cache them separately
+    embedding_cache = EmbeddingCache(
+        f"{MODEL_NAME}/{EMBEDDING_BACKEND}",
+        dim=768,
+        max_size=EMBED_CACHE_SIZE,
+        ttl=EMBED_CACHE_TTL_S or None,
+        disk_dir=EMBED_CACHE_DIR or None,
+        version=EMBED_CACHE_VERSION
+    )
+    engine = create_engine(
+        EMBEDDING_BACKEND, MODEL_NAME, cache=embedding_cache,
+        threads=thread_limits.encoder if thread_limits is not None else None
+    )
+    if warm_up:
+        engine.warm_up()
+    return engine
+
+
+def load_all(warm_up=True):
+    """The encoder and the model bundle are independent, so they load side by side."""
+    global serving, embedding_engine, cascade
+    apply_thread_budget(thread_limits)
+    if CASCADE_CONFIDENCE > 0:
+        cascade = load_cascade(CASCADE_PATH)
+        print(f"Rule cascade {cascade.version} answers at confidence >= {CASCADE_CONFIDENCE:g}")
+    with ThreadPoolExecutor(2, thread_name_prefix="startup") as executor:
+        encoder = executor.submit(load_encoder, warm_up)
+        models = executor.submit(load_serving_models, warm_up)
+        embedding_engine = encoder.result()
+        serving = models.result()
+
+
+def preload_models():
+    """
+    Load every model in a parent process that then forks the workers
+    (gunicorn_conf.py). Workers share the weight pages copy-on-write and skip
+    loading in their startup hook.
+
+    No forward pass or prediction runs here: torch, XGBoost and OpenMP start
+    thread pools on first use, and those do not survive a fork. Each worker
+    warms up after forking instead.
+    """
+    load_all(warm_up=False)
+    # Move everything allocated so far out of the collector's view, so
+    # collections in the workers do not write to (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded models in process {os.getpid()}")
+
 
 @app.on_event("startup")
 def load_models():
-    """Load models once at startup"""
-    global risk_model, xg_model
+    """
+    Load models once at startup, or warm up the ones preloaded before fork.
+    Both are warmed up before the app starts taking requests.
+    """
     try:
-        risk_model = joblib.load("risk_model.pkl")
-        xg_model = pickle.load(open("xg.pkl", "rb"))
+        if serving is not None and embedding_engine is not None:
+            apply_thread_budget(thread_limits)
+            embedding_engine.warm_up()
+            warm_up_models(serving)
+            print(f"Worker {os.getpid()} using preloaded models")
+            return
+        load_all()
         print("Models loaded successfully")
     except Exception as e:
         print(f"Error loading models: {e}")
         raise
 
+
+async def reload_models():
+    """
+    Load and warm the bundle on disk in the background, then swap it in.
+    Requests already running keep the models they started with; the old
+    bundle is freed once the last of them finishes. Raises if the new
+    bundle fails to load, leaving the current one in place.
+    """
+    global serving
+    async with reload_lock:
+        previous = serving.version
+        try:
+            # The default executor, not the inference pool, so reloads never take request slots
+            models = await asyncio.get_running_loop().run_in_executor(None, load_serving_models)
+        except Exception:
+            MODEL_RELOADS["failed"].inc()
+            raise
+        serving = models
+        if prediction_cache is not None:
+            # Keys carry the version, but legacy pickles all report "legacy"
+            prediction_cache.clear()
+        MODEL_RELOADS["ok"].inc()
+        print(f"Swapped model version {previous} -> {models.version}")
+        return {"previous_version": previous, "model_version": models.version}
+
+
+async def watch_bundle(stamp):
+    """Reload whenever manifest.json changes from stamp (save_bundle writes it last)."""
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL_S)
+        current = manifest_stamp()
+        if current is None or current == stamp:
+            continue
+        # Remember the stamp even on failure so a bad bundle is retried only when it changes
+        stamp = current
+        try:
+            await reload_models()
+        except Exception as e:
+            print(f"Model reload failed, keeping version {serving.version}: {e}")
+
+@app.on_event("startup")
+async def start_workers():
+    """
+    Start the bounded inference pool and the embedding batcher.
+    Model work runs on the pool so the event loop keeps serving /health under load.
+    """
+    global embedding_batcher, inference_pool, prediction_cache, reload_lock, watch_task
+    inference_pool = InferencePool()
+    # Coalesce symptom texts from concurrent /predict calls into one forward pass
+    embedding_batcher = EmbeddingBatcher(embedding_engine, pool=inference_pool)
+    embedding_batcher.start()
+    if PREDICTION_CACHE_SIZE > 0:
+        prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S or None)
+    reload_lock = asyncio.Lock()
+    if MODEL_WATCH_INTERVAL_S > 0:
+        watch_task = asyncio.create_task(watch_bundle(manifest_stamp()))
+
+@app.on_event("shutdown")
+async def stop_workers():
+    if watch_task is not None:
+        watch_task.cancel()
+    if embedding_batcher is not None:
+        await embedding_batcher.stop()
+    if inference_pool is not None:
+        inference_pool.shutdown()
+
+def overloaded_error():
+    return HTTPException(
+        status_code=503,
+        detail="Service overloaded, retry later",
+        headers={"Retry-After": str(RETRY_AFTER_S)}
+    )
+
 # Request models
 class UserData(BaseModel):
     Age: int = Field(..., ge=0, le=150, description="Age of the patient")
-    Gender: str = Field(..., description="Gender: 'Male' or 'Female'")
+    # Only the categories the models were trained on: anything else is a 422 up front
+    # rather than an encoding error that would fail a whole /predict_batch chunk
+    Gender: Literal[tuple(GENDER_CODES)] = Field(..., description="Gender: 'Male' or 'Female'")
     Blood_Pressure: float = Field(..., ge=0, description="Blood pressure reading")
     Heart_Rate: float = Field(..., ge=0, description="Heart rate in bpm")
     Temperature: float = Field(..., ge=0, description="Body temperature in Fahrenheit")
-    Pre_Existing_Conditions: str = Field(..., description="Pre-existing conditions or 'None'")
+    Pre_Existing_Conditions: Literal[tuple(PRE_EXISTING_CODES)] = Field(
+        ..., description="Pre-existing conditions: 'Cardiac Issue', 'Heart Disease', 'Hypertension' or 'None'"
+    )
 
 class PredictionRequest(BaseModel):
     user_data: UserData
     symptoms: List[str] = Field(..., min_items=1, description="List of symptom descriptions")
 
+class BatchPredictionRequest(BaseModel):
+    patients: List[PredictionRequest] = Field(..., min_items=1, description="Patients to score")
+
 class PredictionResponse(BaseModel):
     risk: str
     risk_explanation: str
     department: str
     department_explanation: str
+    model_version: str
 
-def output(user_data, symptoms):
-    """Main prediction function"""
-    # Get embedding (shape: (1, 768))
-    symptom_embedding = get_symptom_embedding(
-        symptoms
-    ).cpu().numpy()[0]   # (768,)
-
-    # Encode categorical values properly
-    gender = 1 if user_data["Gender"] == "Female" else 0
-    pre_existing = 0 if user_data["Pre-Existing_Conditions"] == "None" else 1
-
-    # Base structured features
-    data = [
-        user_data["Age"],
-        gender,
-        user_data["Blood_Pressure"],
-        user_data["Heart_Rate"],
-        user_data["Temperature"],
-        pre_existing
-    ]
-
-    # Add all embedding values (768 numbers)
-    data.extend(symptom_embedding.tolist())
+def output_batch(user_data_list, symptom_embeddings, models=None):
+    """
+    Score many patients with one feature matrix.
+    symptom_embeddings: (n_patients, 768) array, one row per patient
+    models: ServingModels to score with (the active ones if None)
+    """
+    if models is None:
+        models = serving
 
-    # Convert to numpy and reshape
-    X_sample = np.array(data).reshape(1, -1)
+    # Structured features followed by all embedding values (768 numbers)
+    with timing.span("features"):
+        X = assemble_features(user_data_list, symptom_embeddings)
 
     # Predict
-    risk, risk_explanation = predict_single_with_explanation(
-        risk_model,
-        X_sample,
-        ["Age", "Gender", "Blood_Pressure", "Heart_Rate", "Temperature", "Pre-Existing_Conditions"]
+    risks, risk_explanations = predict_batch_with_explanation(
+        models.risk_model,
+        X,
+        explainer=models.risk_explainer,
+        predictor=models.risk_predictor,
+        stage="risk"
     )
 
-    department, department_explanation = predict_single_with_explanation(
-        xg_model,
-        X_sample,
-        ["Age", "Gender", "Blood_Pressure", "Heart_Rate", "Temperature", "Pre-Existing_Conditions"]
+    departments, department_explanations = predict_batch_with_explanation(
+        models.bundle.department_model,
+        X,
+        explainer=models.department_explainer,
+        stage="department"
     )
 
-    risk_dict = {
-        0: "Low Risk",
-        1: "Medium Risk",
-        2: "High Risk"
-    }
-    department_dict = {
-    0: "Cardiology",
-    1: "Neurology",
-    2: "Orthopedics",
-    3: "General Medicine"
-}
+    return [
+        {
+            "risk": models.bundle.risk_labels[int(risk)],
+            "risk_explanation": risk_explanation,
+            "department": models.bundle.department_labels[int(department)],
+            "department_explanation": department_explanation,
+            "model_version": models.version
+        }
+        for risk, risk_explanation, department, department_explanation in zip(
+            risks, risk_explanations, departments, department_explanations
+        )
+    ]
+
+
+def output(user_data, symptoms, symptom_embedding=None, models=None):
+    """
+    Main prediction function.
+    symptom_embedding: precomputed (768,) vector for symptoms[0], e.g. from the batcher
+    models: ServingModels to score with (the active ones if None)
+    """
+    if symptom_embedding is None:
+        # Get embedding (shape: (1, 768))
+        symptom_embedding = embedding_engine.embed(
+            symptoms
+        ).cpu().numpy()[0]   # (768,)
 
+    return output_batch([user_data], symptom_embedding.reshape(1, -1), models)[0]
 
+
+def to_user_data_dict(user_data):
     return {
-    "risk": risk_dict[int(risk)],
-    "risk_explanation": risk_explanation,
-    "department": department_dict[int(department)],
-    "department_explanation": department_explanation
-}
+        "Age": user_data.Age,
+        "Gender": user_data.Gender,
+        "Blood_Pressure": user_data.Blood_Pressure,
+        "Heart_Rate": user_data.Heart_Rate,
+        "Temperature": user_data.Temperature,
+        "Pre-Existing_Conditions": user_data.Pre_Existing_Conditions
+    }
+
+
+def decide_by_rules(user_data_list):
+    """
+    The rule cascade's answers for the clear-cut patients: None for the rest,
+    and for everyone when the cascade is off.
+    """
+    if cascade is None:
+        return [None] * len(user_data_list)
+    with timing.span("cascade"):
+        results = cascade.decide(user_data_list, CASCADE_CONFIDENCE)
+    n_rules = sum(result is not None for result in results)
+    CASCADE_DECISIONS["rules"].inc(n_rules)
+    CASCADE_DECISIONS["model"].inc(len(results) - n_rules)
+    return results
+
+
+async def embed_chunk(texts, priorities):
+    """
+    CLS vectors for a chunk's symptom texts, aligned to texts.
+    Each distinct text is queued once on the embedding batcher at the most urgent
+    priority of the patients sharing it, so a batch competes with /predict traffic
+    text by text (at most EMBED_MAX_BATCH_SIZE per forward pass) instead of holding
+    the encoder for the whole chunk.
+    returns: (embeddings, n_unique)
+    """
+    text_priority = {}
+    for text, priority in zip(texts, priorities):
+        text_priority[text] = most_urgent((text_priority.get(text, LEVELS[-1]), priority))
+    unique = list(text_priority)
+    vectors = await asyncio.wait_for(
+        asyncio.gather(*(
+            embedding_batcher.embed(text, priority=text_priority[text]) for text in unique
+        )),
+        EMBED_TIMEOUT_S
+    )
+    by_text = dict(zip(unique, vectors))
+    return np.stack([by_text[text] for text in texts]), len(unique)
+
+
+async def score_chunk(patients, models, priorities):
+    """
+    Score one chunk of patients: the rule cascade answers the clear-cut ones, the
+    rest are embedded through the batcher and scored by the models in one
+    vectorized pass on the inference pool.
+    priorities: urgency level of each patient
+    """
+    user_data_list = [to_user_data_dict(patient.user_data) for patient in patients]
+    results = decide_by_rules(user_data_list)
+    rest = [i for i, result in enumerate(results) if result is None]
+    if not rest:
+        return results
+
+    # Only the first symptom's CLS vector is used by the models
+    texts = [patients[i].symptoms[0] for i in rest]
+    rest_priorities = [priorities[i] for i in rest]
+    symptom_embeddings, n_unique = await embed_chunk(texts, rest_priorities)
+    BATCH_DISTINCT_TEXTS.inc(n_unique)
+    BATCH_TEXTS.inc(len(texts))
+    scored = await inference_pool.run(
+        output_batch, [user_data_list[i] for i in rest], symptom_embeddings, models,
+        priority=most_urgent(rest_priorities)
+    )
+    for i, result in zip(rest, scored):
+        results[i] = result
+    return results
+
+
+async def score_request(request, models, priority="low"):
+    """
+    Embed and score one /predict request, mapping failures to HTTP errors.
+    priority: urgency level; more urgent requests are embedded and scored first.
+    """
+    try:
+        user_data_dict = to_user_data_dict(request.user_data)
+        # Clear-cut cases are answered from the vitals before output() needs BERT;
+        # one tree lookup, cheap enough to run on the event loop
+        decided = decide_by_rules([user_data_dict])[0]
+        if decided is not None:
+            return decided
+
+        # Only the first symptom's CLS vector is used by the models
+        try:
+            symptom_embedding = await asyncio.wait_for(
+                embedding_batcher.embed(request.symptoms[0], priority=priority), EMBED_TIMEOUT_S
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Embedding stage timed out")
+
+        try:
+            return await inference_pool.run(
+                output, user_data_dict, request.symptoms, symptom_embedding, models,
+                timeout=MODEL_TIMEOUT_S, priority=priority
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Model stage timed out")
+    except HTTPException:
+        raise
+    except Overloaded:
+        raise overloaded_error()
+    except Exception as e:
+        # Unknown categorical values are rejected by UserData (422) before this runs,
+        # so anything raised here is a server-side failure
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+
+async def cached_score_request(request, models, priority="low"):
+    """score_request() behind the prediction cache, if enabled."""
+    if prediction_cache is None:
+        return await score_request(request, models, priority)
+    key = prediction_key(models.version, to_user_data_dict(request.user_data), request.symptoms)
+    return await prediction_cache.get_or_compute(
+        key, lambda: score_request(request, models, priority)
+    )
 
 
 # API Endpoints
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
+async def predict(request: PredictionRequest, response: Response,
+                  x_timing: str = Header(default="")):
     """
     Predict risk level and recommended department based on patient data and symptoms.
 
-    Returns risk classification (Low/Medium/High Risk) and department recommendation
-    with explanations based on SHAP values.
+    Returns risk classification (Low/Medium/High Risk) and department recommendation,
+    each explained by its top positive feature contributions: TreeSHAP values, or
+    path-based forest contributions for the risk with EXPLANATION_BACKEND=approximate.
+
+    Send any non-empty X-Timing header to get the per-stage breakdown back in an
+    X-Timing response header (milliseconds; the embedding batch is shared with
+    the requests batched alongside this one).
+
+    Queued work is ordered by a vitals pre-score (urgency.py), so high-acuity
+    patients are not stuck behind low-acuity traffic under load.
     """
+    # Pin the models now so a reload mid-request cannot mix versions
+    models = serving
+    priority = urgency_level(to_user_data_dict(request.user_data))
+    start = time.perf_counter()
     try:
-        user_data_dict = {
-            "Age": request.user_data.Age,
-            "Gender": request.user_data.Gender,
-            "Blood_Pressure": request.user_data.Blood_Pressure,
-            "Heart_Rate": request.user_data.Heart_Rate,
-            "Temperature": request.user_data.Temperature,
-            "Pre-Existing_Conditions": request.user_data.Pre_Existing_Conditions
-        }
-        result = output(user_data_dict, request.symptoms)
+        if not x_timing:
+            with timing.span("total"):
+                return await cached_score_request(request, models, priority)
+
+        with timing.collecting() as spans:
+            with timing.span("total"):
+                result = await cached_score_request(request, models, priority)
+        if spans:
+            response.headers["X-Timing"] = timing.format_header(spans)
         return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+    finally:
+        elapsed = time.perf_counter() - start
+        for metric in PREDICT_SECONDS[priority]:
+            metric.observe(elapsed)
+
+@app.post("/predict_batch")
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Score many patients in one call.
+
+    Patients are processed in chunks of PREDICT_BATCH_CHUNK_SIZE (distinct
+    symptom texts go through the embedding batcher at each patient's urgency,
+    then one vectorized model/explanation pass per chunk) and results are
+    streamed back as NDJSON, one line per patient in request order, so the
+    first lines arrive before the whole batch is done.
+    """
+    if inference_pool.saturated:
+        raise overloaded_error()
+
+    # The whole batch is scored by one model version
+    models = serving
+
+    async def stream():
+        patients = request.patients
+        for start in range(0, len(patients), PREDICT_BATCH_CHUNK_SIZE):
+            chunk = patients[start:start + PREDICT_BATCH_CHUNK_SIZE]
+            priorities = [urgency_level(to_user_data_dict(patient.user_data)) for patient in chunk]
+            try:
+                results = await score_chunk(chunk, models, priorities)
+            except Overloaded:
+                results = [{"error": "Service overloaded, retry later"} for _ in chunk]
+            except asyncio.TimeoutError:
+                results = [{"error": "Embedding stage timed out"} for _ in chunk]
+            except Exception as e:
+                # Headers are already sent; report the failure per line and keep going
+                results = [{"error": f"Prediction error: {str(e)}"} for _ in chunk]
+            for offset, result in enumerate(results):
+                yield json.dumps({"index": start + offset, **result}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.get("/health")
 async def health_check():
     """Check if the API and models are loaded correctly."""
     return {
         "status": "healthy",
-        "models_loaded": risk_model is not None and xg_model is not None
+        "worker_pid": os.getpid(),
+        "models_loaded": serving is not None and embedding_engine is not None,
+        "model_version": serving.version if serving is not None else None,
+        "model_load_seconds": serving.bundle.load_seconds if serving is not None else None,
+        "inference_pool": inference_pool.stats() if inference_pool is not None else None,
+        "thread_budget": vars(thread_limits) if thread_limits is not None else None,
+        "cascade": cascade.version if cascade is not None else None,
+        # The mode actually in use: warm-up falls back to eager if a graph is unusable
+        "encoder_compile": embedding_engine.compile_mode if embedding_engine is not None else None,
+        "prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "embedding_cache": (
+            embedding_engine.cache.stats()
+            if embedding_engine is not None and embedding_engine.cache is not None
+            else None
+        )
     }
 
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: str = Header(default="")):
+    """
+    Load the bundle in MODEL_BUNDLE_DIR, warm it and swap it in without a restart.
+    Returns the previous and new model versions; on failure the current models stay live.
+    Disabled (404) unless ADMIN_TOKEN is set: each reload rebuilds the explainers and
+    clears the prediction cache, so it must not be open to every caller.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin reload is disabled (ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return await reload_models()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving {serving.version}: {str(e)}"
+        )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus-style service metrics."""
+    return metrics.render()
+
 @app.get("/")
 async def root():
     """API information."""
@@ -160,7 +661,10 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/predict": "POST - Predict risk and department",
+            "/predict_batch": "POST - Score many patients, streamed as NDJSON",
             "/health": "GET - Health check",
+            "/admin/reload": "POST - Hot-reload the model bundle from disk (needs ADMIN_TOKEN)",
+            "/metrics": "GET - Service metrics",
             "/docs": "GET - API documentation"
         }
     }
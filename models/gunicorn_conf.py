@@ -0,0 +1,50 @@
+"""
+Multi-worker serving:
+
+    gunicorn -c gunicorn_conf.py full_model:app
+
+With SERVE_PRELOAD (the default) the gunicorn master imports the app and
+loads every model once, then forks SERVE_WORKERS uvicorn workers. BERT,
+XGBoost and the explainer tables are shared copy-on-write, so each extra
+worker adds its private working set rather than another copy of the models.
+The RandomForest is served from the bundle's risk_forest/*.npy arrays,
+memory-mapped read-only: workers share those pages through the page cache
+even without preload. The sklearn pickle is still unpickled, privately in
+each process, whenever TreeSHAP explains the forest; only
+EXPLANATION_BACKEND=approximate with RISK_ENGINE=flat and a bundle that
+has the arrays skips it. bench_workers.py measures RSS and PSS per worker.
+
+Each worker limits torch, XGBoost, sklearn and BLAS to its share of the
+cores (WORKER_THREADS, see thread_budget.py), so SERVE_WORKERS processes
+do not oversubscribe the machine. Set the worker count with SERVE_WORKERS
+(or WEB_CONCURRENCY), not -w, which the budgets cannot see. bench_threads.py compares p99 latency
+with and without the budget and with a traced / compiled encoder.
+
+A reload only swaps models in the worker that performs it, and that worker
+then holds private copies of XGBoost and the explainer tables (the forest
+arrays are mapped from the new files). With several workers, use MODEL_WATCH_INTERVAL_S
+so that every worker picks up a new bundle rather than POST /admin/reload.
+Restart gunicorn to share the weights again.
+"""
+from config import SERVE_BIND, SERVE_PRELOAD, SERVE_WORKERS
+
+
+bind = SERVE_BIND
+workers = SERVE_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = SERVE_PRELOAD
+# Workers load (or warm up) models in their startup hook before answering
+timeout = 300
+
+
+def on_starting(server):
+    if server.num_workers != SERVE_WORKERS:
+        print(f"Running {server.num_workers} workers but sizing thread budgets for "
+              f"SERVE_WORKERS={SERVE_WORKERS}; set SERVE_WORKERS instead of -w")
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is forked
+    if SERVE_PRELOAD:
+        import full_model
+        full_model.preload_models()
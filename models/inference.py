@@ -0,0 +1,140 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+import timing
+from config import INFERENCE_WORKERS, INFERENCE_MAX_QUEUE
+from urgency import LEVELS, schedule_key
+
+
+IN_FLIGHT = metrics.gauge(
+    "inference_pool_in_flight",
+    "Inference jobs running or queued in the worker pool"
+)
+REJECTED = metrics.counter(
+    "inference_pool_rejected_total",
+    "Jobs rejected because the pool was full"
+)
+QUEUE_SECONDS = {
+    level: metrics.histogram(
+        "inference_pool_queue_seconds",
+        "Time a job waited for a worker, by urgency",
+        buckets=timing.STAGE_BUCKETS,
+        labels={"priority": level}
+    )
+    for level in LEVELS
+}
+
+
+class Overloaded(Exception):
+    """Raised when there is no room to queue more work; map to HTTP 503."""
+
+
+class InferencePool:
+    """
+    Bounded worker pool for CPU-bound model work.
+
+    At most max_workers jobs run at once and at most max_queue more wait for
+    a worker; anything beyond that is rejected immediately with Overloaded
+    so callers can shed load instead of piling up latency.
+
+    Waiting jobs sit in a heap ordered by urgency.schedule_key: a free worker
+    takes the most urgent one, and aging bounds how long a low-priority job
+    can be overtaken. Each submit() hands the executor one token that runs
+    whichever job is first in the heap when a worker picks it up.
+    """
+
+    def __init__(self, max_workers=INFERENCE_WORKERS, max_queue=INFERENCE_MAX_QUEUE):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="inference")
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._heap = []
+        self._order = itertools.count()   # FIFO among equal keys
+
+    @property
+    def pending(self):
+        return self._pending
+
+    @property
+    def saturated(self):
+        return self._pending >= self.capacity
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+            IN_FLIGHT.set(self._pending)
+
+    async def run(self, fn, *args, timeout=None, priority="low"):
+        """
+        Run fn(*args) on the pool and await its result.
+        priority: urgency level (urgency.LEVELS) deciding its place in the queue.
+        Raises Overloaded when full and asyncio.TimeoutError after timeout seconds.
+        A timed-out job keeps its slot until the worker actually finishes it.
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                REJECTED.inc()
+                raise Overloaded("Inference queue is full")
+            self._pending += 1
+            IN_FLIGHT.set(self._pending)
+
+        future = self.submit(fn, *args, priority=priority)
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    def submit(self, fn, *args, priority="low"):
+        """
+        Queue fn(*args) by priority without the capacity check; returns a
+        concurrent.futures.Future. Used for work that already holds a slot
+        elsewhere, like the embedding batcher's forward passes.
+        """
+        future = Future()
+        submitted = time.perf_counter()
+        # Run in a copy of the caller's context so the job's spans reach its request
+        job = (submitted, priority, contextvars.copy_context(), fn, args, future)
+        with self._lock:
+            heapq.heappush(self._heap, (schedule_key(priority, submitted), next(self._order), job))
+        self.executor.submit(self._run_next)
+        return future
+
+    def _run_next(self):
+        with self._lock:
+            _, _, (submitted, priority, context, fn, args, future) = heapq.heappop(self._heap)
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = context.run(self._timed, submitted, priority, fn, args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _timed(submitted, priority, fn, args):
+        wait = time.perf_counter() - submitted
+        QUEUE_SECONDS[priority].observe(wait)
+        timing.record("pool_queue", wait)
+        return fn(*args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # Jobs whose tokens were cancelled would otherwise never resolve
+        with self._lock:
+            jobs, self._heap = self._heap, []
+        for _, _, (_, _, _, _, _, future) in jobs:
+            future.cancel()
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._pending,
+            "queued": len(self._heap),
+            "capacity": self.capacity,
+        }
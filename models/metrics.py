@@ -0,0 +1,154 @@
+import threading
+from collections import deque
+
+
+# Minimal in-process metrics with Prometheus text exposition.
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list(extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = sorted(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.bucket_counts[i] += 1
+
+    def samples(self):
+        with self._lock:
+            out = [
+                (self.name + "_bucket", self.labels + (("le", bound),), n)
+                for bound, n in zip(self.buckets, self.bucket_counts)
+            ]
+            out.append((self.name + "_bucket", self.labels + (("le", "+Inf"),), self.count))
+            out.append((self.name + "_sum", self.labels, self.sum))
+            out.append((self.name + "_count", self.labels, self.count))
+        return out
+
+
+class Summary:
+    """Quantiles over the most recent `window` observations, plus running sum and count."""
+
+    kind = "summary"
+
+    def __init__(self, name, help_text, quantiles, window, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.quantiles = quantiles
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self.recent.append(value)
+
+    def samples(self):
+        with self._lock:
+            recent = sorted(self.recent)
+            out = [
+                (self.name, self.labels + (("quantile", q),),
+                 recent[min(int(q * len(recent)), len(recent) - 1)])
+                for q in self.quantiles
+            ] if recent else []
+            out.append((self.name + "_sum", self.labels, self.sum))
+            out.append((self.name + "_count", self.labels, self.count))
+        return out
+
+
+def _get_or_create(cls, name, help_text, labels, *args):
+    key = (name, tuple(sorted((labels or {}).items())))
+    with _registry_lock:
+        metric = _registry.get(key)
+        if metric is None:
+            metric = cls(name, help_text, *args, labels=key[1])
+            _registry[key] = metric
+        return metric
+
+
+def counter(name, help_text, labels=None):
+    return _get_or_create(Counter, name, help_text, labels)
+
+
+def gauge(name, help_text, labels=None):
+    return _get_or_create(Gauge, name, help_text, labels)
+
+
+def histogram(name, help_text, buckets, labels=None):
+    return _get_or_create(Histogram, name, help_text, labels, buckets)
+
+
+def summary(name, help_text, quantiles=(0.5, 0.95, 0.99), window=1024, labels=None):
+    return _get_or_create(Summary, name, help_text, labels, quantiles, window)
+
+
+def render():
+    """Render every registered metric in Prometheus text format."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+
+    lines = []
+    seen = set()
+    for metric in metrics:
+        if metric.name not in seen:
+            seen.add(metric.name)
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample_name, labels, value in metric.samples():
+            lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,118 @@
+import os
+import threading
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from transformers import AutoTokenizer, AutoModel
+
+import timing
+from config import ONNX_DIR
+from to_embeddings import EmbeddingEngine, MODEL_NAME
+
+
+class _ClsEncoder(torch.nn.Module):
+    """Wraps the transformer so the exported graph returns only the CLS vector."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            token_type_ids=token_type_ids
+        )
+        return outputs.last_hidden_state[:, 0, :]
+
+
+def export_onnx(model_name=MODEL_NAME, onnx_dir=ONNX_DIR):
+    """Export the encoder to <onnx_dir>/encoder.onnx (skipped if it already exists)."""
+    path = os.path.join(onnx_dir, "encoder.onnx")
+    if os.path.exists(path):
+        return path
+    os.makedirs(onnx_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name, use_safetensors=True)
+    model.eval()
+
+    sample = tokenizer(["Patient reports chest discomfort."], return_tensors="pt")
+    torch.onnx.export(
+        _ClsEncoder(model),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["cls_embedding"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "token_type_ids": {0: "batch", 1: "sequence"},
+            "cls_embedding": {0: "batch"}
+        },
+        opset_version=14
+    )
+    return path
+
+
+def quantize_onnx(path):
+    """Dynamic INT8 quantization of the weights (activations stay fp32)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_path = path.replace(".onnx", ".int8.onnx")
+    if not os.path.exists(quantized_path):
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class OnnxEmbeddingEngine(EmbeddingEngine):
+    """
+    Drop-in EmbeddingEngine running the encoder on ONNX Runtime (CPU).
+    The model is exported on first use and, if quantize is set, converted
+    to dynamic INT8. threads caps the session's intra-op threads.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, quantize=False, max_length=64,
+                 cache=None, onnx_dir=ONNX_DIR, threads=None):
+        self.model_name = model_name
+        self.cache = cache
+        self.max_length = max_length
+        self.backend = "onnx-int8" if quantize else "onnx"
+
+        path = export_onnx(model_name, onnx_dir)
+        if quantize:
+            path = quantize_onnx(path)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        # Tokenizer is shared; ONNX Runtime sessions are thread-safe but we keep
+        # the same serialized behaviour as the PyTorch engine
+        self._lock = threading.Lock()
+
+    def _forward(self, text_list):
+        with self._lock:
+            with timing.span("tokenize"):
+                encoded = self.tokenizer(
+                    text_list,
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors="np"
+                )
+                feeds = {
+                    name: np.asarray(value, dtype=np.int64)
+                    for name, value in encoded.items() if name in self._input_names
+                }
+            with timing.span("encode"):
+                (cls_embeddings,) = self.session.run(None, feeds)
+
+        return torch.from_numpy(cls_embeddings)
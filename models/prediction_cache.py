@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import json
+import threading
+
+import metrics
+from embedding_cache import LRUCache, normalize_text
+
+
+LOOKUPS = {
+    result: metrics.counter(
+        "prediction_cache_lookups_total",
+        "Prediction cache lookups by result (coalesced = joined an identical request in flight)",
+        labels={"result": result}
+    )
+    for result in ("hit", "miss", "coalesced")
+}
+
+
+def prediction_key(model_version, user_data, symptoms):
+    """
+    Canonical hash of one /predict payload for one model version.
+    user_data: dict from to_user_data_dict(); numbers are already floats/ints
+    after validation, and symptom whitespace is collapsed as in the embedding cache.
+    """
+    canonical = json.dumps(
+        {
+            "model_version": model_version,
+            "user_data": user_data,
+            "symptoms": [normalize_text(s) for s in symptoms]
+        },
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Bounded, TTL'd cache of /predict results with single-flight de-duplication.
+
+    The first request for a key computes the result in its own task; identical
+    requests arriving meanwhile await that task instead of rerunning the
+    pipeline. Failures are not cached, so the next request retries. The task
+    survives a cancelled caller, so its result still lands in the cache.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_size, ttl=None):
+        self._results = LRUCache(max_size, ttl)
+        self._in_flight = {}
+        # stats() is also read off the loop (health checks, benchmarks)
+        self._counts_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key, compute):
+        """compute: zero-argument coroutine function producing the result for key."""
+        result = self._results.get(key)
+        if result is not None:
+            self._count("hits")
+            LOOKUPS["hit"].inc()
+            return result
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self._count("misses")
+            LOOKUPS["miss"].inc()
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._count("coalesced")
+            LOOKUPS["coalesced"].inc()
+        return await asyncio.shield(task)
+
+    def _count(self, name):
+        with self._counts_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _finish(self, key, task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._results.put(key, task.result())
+
+    def clear(self):
+        self._results.clear()
+
+    def stats(self):
+        with self._counts_lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+        lookups = hits + misses + coalesced
+        return {
+            "entries": len(self._results),
+            "in_flight": len(self._in_flight),
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            # Coalesced requests skipped the pipeline too
+            "hit_rate": (hits + coalesced) / lookups if lookups else None
+        }
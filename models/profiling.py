@@ -0,0 +1,73 @@
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def rss_mb():
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Not Linux: fall back to the peak, which is the best available
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """
+    Records wall-clock time and peak RSS for named stages:
+
+        timer = StageTimer()
+        with timer.stage("embed train"):
+            ...
+        timer.report()
+
+    Peak RSS is sampled by a background thread while the stage runs, so it
+    reflects that stage rather than the whole process lifetime.
+    """
+
+    def __init__(self, sample_interval=0.05):
+        self.sample_interval = sample_interval
+        self.stages = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start_rss = rss_mb()
+        peak = [start_rss]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.sample_interval):
+                peak[0] = max(peak[0], rss_mb())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            done.set()
+            sampler.join()
+            peak[0] = max(peak[0], rss_mb())
+            with self._lock:
+                self.stages.append((name, wall, start_rss, peak[0]))
+            print(f"[{name}] {wall:.2f}s, peak RSS {peak[0]:.0f} MB")
+
+    def report(self):
+        print(f"{'stage':<28} {'wall (s)':>9} {'start RSS':>10} {'peak RSS':>10}")
+        for name, wall, start_rss, peak in self.stages:
+            print(f"{name:<28} {wall:9.2f} {start_rss:8.0f}MB {peak:8.0f}MB")
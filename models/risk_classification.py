@@ -5,23 +5,28 @@ from sklearn.metrics import log_loss
 import joblib
 
 
-def train_random_forest(X_train, y_train):
+def train_random_forest(X_train, y_train, n_jobs=None, score_train=False):
     """
-    Train Random Forest and return model + final loss.
+    Train Random Forest and return model + training probabilities.
+    n_jobs: cores used to build the trees (None = 1, -1 = all)
+    score_train: also score the training set to print the loss (probs is None otherwise)
     """
 
     model = RandomForestClassifier(
         n_estimators=200,
         max_depth=None,
-        random_state=42
+        random_state=42,
+        n_jobs=n_jobs
     )
 
     model.fit(X_train, y_train)
 
 
-    probs = model.predict_proba(X_train)
-    loss = log_loss(y_train, probs)
-    print(f"Training risk Loss: {loss:.4f}")
+    probs = None
+    if score_train:
+        probs = model.predict_proba(X_train)
+        loss = log_loss(y_train, probs)
+        print(f"Training risk Loss: {loss:.4f}")
     
     joblib.dump(model, 'risk_model.pkl')
     
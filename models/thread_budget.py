@@ -0,0 +1,63 @@
+import os
+import sys
+
+from config import INFERENCE_WORKERS, SERVE_WORKERS, WORKER_THREADS
+
+
+def available_cores():
+    """Cores this process may run on (honours taskset / cpuset limits, unlike os.cpu_count())."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """
+    CPU threads one serving worker may use, split between its libraries.
+
+    encoder: torch (or ONNX Runtime) intra-op threads. The engine serializes
+        forward passes, so the encoder gets the worker's whole share.
+    model: threads per XGBoost, sklearn or BLAS call. Up to INFERENCE_WORKERS
+        of those run at once, so each gets an equal slice.
+    """
+
+    def __init__(self, threads, pool_threads=INFERENCE_WORKERS):
+        self.threads = threads
+        self.encoder = threads
+        self.model = max(1, threads // max(1, pool_threads))
+
+    def __repr__(self):
+        return f"ThreadBudget(threads={self.threads}, encoder={self.encoder}, model={self.model})"
+
+
+def thread_budget(worker_threads=WORKER_THREADS, workers=SERVE_WORKERS):
+    """
+    The budget for one of `workers` processes sharing this machine's cores,
+    or None when WORKER_THREADS is negative (every library keeps its default).
+    A worker cannot see how many siblings it has, so the count comes from
+    SERVE_WORKERS / WEB_CONCURRENCY: `uvicorn --workers N` without either set
+    gives every worker all the cores.
+    """
+    if worker_threads < 0:
+        return None
+    return ThreadBudget(worker_threads or max(1, available_cores() // max(1, workers)))
+
+
+def apply_thread_budget(budget):
+    """
+    Apply the process-wide limits. Call it in every worker before its warm-up:
+    thread pools are created on first use, after the fork.
+    Per-model limits are set where the models are loaded (full_model.ServingModels).
+    """
+    if budget is None:
+        return
+    # Read by OpenMP / BLAS runtimes loaded from here on (forked workers inherit them)
+    for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(budget.model)
+    # ... and the BLAS NumPy has already loaded
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(budget.model, user_api="blas")
+    if "torch" in sys.modules:
+        import torch
+        torch.set_num_threads(budget.encoder)
@@ -0,0 +1,98 @@
+import contextvars
+import time
+from contextlib import contextmanager, nullcontext
+
+import metrics
+from config import STAGE_TIMING, STAGE_TIMING_WINDOW
+
+
+# Per-request span totals, set by collecting(); None when nobody is collecting
+_spans = contextvars.ContextVar("timing_spans", default=None)
+_NOOP = nullcontext()
+_stage_metrics = {}
+
+STAGE_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+
+def _metrics_for(stage):
+    pair = _stage_metrics.get(stage)
+    if pair is None:
+        pair = (
+            metrics.histogram(
+                "predict_stage_seconds",
+                "Time spent in each prediction stage",
+                buckets=STAGE_BUCKETS,
+                labels={"stage": stage}
+            ),
+            metrics.summary(
+                "predict_stage_recent_seconds",
+                f"p50/p95/p99 of each prediction stage over its last {STAGE_TIMING_WINDOW} spans",
+                window=STAGE_TIMING_WINDOW,
+                labels={"stage": stage}
+            )
+        )
+        _stage_metrics[stage] = pair
+    return pair
+
+
+def record(stage, seconds):
+    """Add one measurement of stage to the metrics and to the collecting request, if any."""
+    if not STAGE_TIMING:
+        return
+    histogram, summary = _metrics_for(stage)
+    histogram.observe(seconds)
+    summary.observe(seconds)
+    spans = _spans.get()
+    if spans is not None:
+        spans[stage] = spans.get(stage, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.start)
+
+
+def span(stage):
+    """
+    Time a block as one stage:
+
+        with timing.span("risk_predict"):
+            ...
+
+    With STAGE_TIMING off this returns a shared no-op context manager.
+    """
+    if not STAGE_TIMING:
+        return _NOOP
+    return _Span(stage)
+
+
+@contextmanager
+def collecting():
+    """Gather the spans recorded in this context (and the pool jobs it starts) into a dict."""
+    spans = {}
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def add(spans):
+    """Credit spans measured elsewhere (e.g. a shared embedding batch) to the collecting request."""
+    current = _spans.get()
+    if STAGE_TIMING and current is not None:
+        for stage, seconds in spans.items():
+            current[stage] = current.get(stage, 0.0) + seconds
+
+
+def format_header(spans):
+    """X-Timing value: stage=milliseconds pairs in the order the stages ran."""
+    return ", ".join(f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in spans.items())
@@ -1,55 +1,235 @@
-import torch
-from transformers import AutoTokenizer, AutoModel
+import threading
 
+import numpy as np
 
-# --------- FUNCTION TO GET EMBEDDINGS ---------
-def get_symptom_embedding(text_list):
-    # --------- CONFIG ---------
-    MODEL_NAME = "emilyalsentzer/Bio_ClinicalBERT"
-    DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+import timing
+from config import EMBEDDING_BACKEND, EMBED_OFFLINE_CACHE_SIZE, ENCODER_COMPILE
+from embedding_cache import EmbeddingCache
+
+
+# --------- CONFIG ---------
+MODEL_NAME = "emilyalsentzer/Bio_ClinicalBERT"
+COMPILE_MODES = ("eager", "torchscript", "compile")
+# Traced / compiled encoders pad every batch to a multiple of this many tokens,
+# so a few graphs (16, 32, 48, 64 tokens) cover every input
+PAD_MULTIPLE = 16
+# BertModel.forward's positional order, used to call a traced graph
+TRACE_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+# Short, medium and long texts: warm-up batches exercise both padding and truncation
+WARMUP_TEXTS = [
+    "Patient reports chest discomfort.",
+    "Fever and productive cough for three days, worse at night, with mild shortness of breath.",
+    "Sudden severe headache with blurred vision, nausea, vomiting and weakness in the left arm, "
+    "onset two hours ago while at rest, history of hypertension and poorly controlled diabetes, "
+    "now drowsy and confused according to family members who brought the patient in." * 2,
+]
+
+
+def default_device():
+    """GPU if available. Imports torch, so it is only called when an engine is built."""
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-    # --------- LOAD MODEL ---------
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModel.from_pretrained(
-        MODEL_NAME,
-        use_safetensors=True
-    )
 
-    model.to(DEVICE)
-    model.eval()
+class EmbeddingEngine:
+    """
+    Owns the tokenizer and model for the lifetime of the process.
+    Create it once (e.g. in the FastAPI startup hook) and share it;
+    calls to embed() are serialized so it is safe to use from many threads.
+    An optional EmbeddingCache skips the forward pass for texts seen before.
+    torch and transformers are imported here rather than at module import,
+    so importing this module (e.g. for MODEL_NAME) stays cheap.
+
+    threads: torch intra-op threads (process-wide; None keeps torch's default).
+    compile_mode: "eager", "torchscript" or "compile". The graphs are built in
+    warm_up(), which falls back to eager if they do not match the eager model.
+    """
+
+    backend = "torch"
+    compile_mode = "eager"
+
+    def __init__(self, model_name=MODEL_NAME, device=None, max_length=64, cache=None,
+                 threads=None, compile_mode="eager"):
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+
+        if compile_mode not in COMPILE_MODES:
+            raise ValueError(f"Unknown encoder compile mode: {compile_mode}")
+        if threads:
+            torch.set_num_threads(threads)
+
+        self.model_name = model_name
+        self.cache = cache
+        self.device = device if device is not None else default_device()
+        self.max_length = max_length   # short phrases, so 64 is enough
+        self.compile_mode = compile_mode
+
+        # --------- LOAD MODEL ---------
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(
+            model_name,
+            use_safetensors=True,
+            # Tuple outputs, which torch.jit.trace needs
+            torchscript=compile_mode == "torchscript"
+        )
+
+        self.model.to(self.device)
+        self.model.eval()
+
+        self._traced = {}   # padded length -> traced graph
+        self._compiled = torch.compile(self.model, dynamic=True) if compile_mode == "compile" else None
+
+        # Fast tokenizers and the model are not safe to call concurrently
+        self._lock = threading.Lock()
+
+    def embed(self, text_list):
+        """
+        text_list: list of symptom strings
+        returns: tensor of shape (batch_size, hidden_size)
+        """
+        import torch
+
+        if self.cache is None:
+            return self._forward(text_list)
+
+        found, missing = self.cache.lookup(text_list)
+        if missing:
+            missing_texts = [text_list[i] for i in missing]
+            computed = self._forward(missing_texts).cpu().numpy()
+            self.cache.store(missing_texts, computed)
+            found.update(zip(missing, computed))
+
+        return torch.from_numpy(
+            np.stack([found[i] for i in range(len(text_list))]).astype(np.float32)
+        )
+
+    def warm_up(self):
+        """
+        Uncached forward passes, so the first request does not pay for lazy initialization.
+        A traced or compiled encoder is built here for every padded length and checked
+        against the eager model on batches of one and several texts.
+        """
+        if self.compile_mode == "eager":
+            self._forward(WARMUP_TEXTS[:1])
+            return
+
+        import torch
+
+        try:
+            with self._lock, torch.no_grad():
+                for length in range(PAD_MULTIPLE, self.max_length + 1, PAD_MULTIPLE):
+                    for texts in (WARMUP_TEXTS[:1], WARMUP_TEXTS):
+                        encoded = self._tokenize(texts, length)
+                        fast = self._run(encoded)[:, 0, :]
+                        eager = self._run(encoded, eager=True)[:, 0, :]
+                        if not torch.allclose(fast, eager, rtol=1e-3, atol=1e-4):
+                            raise ValueError(
+                                f"output differs from eager at {length} tokens, batch of {len(texts)}"
+                            )
+        except Exception as e:
+            print(f"{self.compile_mode} encoder unusable, serving the eager model: {e}")
+            self.compile_mode = "eager"
+            self._traced.clear()
+            self._compiled = None
+
+    def _tokenize(self, text_list, length=None):
+        """Token tensors on the engine's device; length pads or truncates to exactly that many tokens."""
+        encoded = self.tokenizer(
+            text_list,
+            padding="max_length" if length else True,
+            truncation=True,
+            max_length=length or self.max_length,
+            pad_to_multiple_of=None if self.compile_mode == "eager" else PAD_MULTIPLE,
+            return_tensors="pt"
+        )
+        return {key: val.to(self.device) for key, val in encoded.items()}
+
+    def _run(self, encoded, eager=False):
+        """last_hidden_state for a tokenized batch, through the traced or compiled graph unless eager."""
+        import torch
+
+        if eager or self.compile_mode == "eager":
+            return self.model(**encoded)[0]
+        if self.compile_mode == "compile":
+            return self._compiled(**encoded)[0]
+        inputs = tuple(encoded[name] for name in TRACE_INPUTS)
+        length = inputs[0].shape[1]
+        if length not in self._traced:
+            self._traced[length] = torch.jit.trace(self.model, inputs)
+        return self._traced[length](*inputs)[0]
+
+    def _forward(self, text_list):
+        import torch
+
+        with self._lock:
+            with timing.span("tokenize"):
+                encoded = self._tokenize(text_list)
+
+            with timing.span("encode"):
+                with torch.no_grad():
+                    hidden = self._run(encoded)
+
+        # CLS token embedding (recommended for classification tasks), copied out so the
+        # result does not keep the full batch x seq x hidden tensor alive
+        return hidden[:, 0, :].contiguous()
+
+
+def create_engine(backend=EMBEDDING_BACKEND, model_name=MODEL_NAME, cache=None,
+                  threads=None, compile_mode=ENCODER_COMPILE):
+    """
+    Build the symptom encoder selected by config.
+    backend: "torch", "onnx" or "onnx-int8" (the ONNX ones need onnxruntime)
+    threads: intra-op threads for the encoder (None = library default)
+    compile_mode: see EmbeddingEngine; the ONNX engines ignore it
+    """
+    if backend == "torch":
+        return EmbeddingEngine(model_name, cache=cache, threads=threads, compile_mode=compile_mode)
+    if backend in ("onnx", "onnx-int8"):
+        from onnx_encoder import OnnxEmbeddingEngine
+        return OnnxEmbeddingEngine(
+            model_name, quantize=backend == "onnx-int8", cache=cache, threads=threads
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_engine():
+    """
+    Return the process-wide offline engine (feature stores, training, benchmarks),
+    loading it on first use. The service builds its own engine in full_model.
+    """
+    global _default_engine
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                # Small memory-only cache: texts repeated across chunks skip BERT without
+                # the serving-sized EMBED_CACHE_SIZE tier growing with the dataset
+                cache = EmbeddingCache(
+                    f"{MODEL_NAME}/{EMBEDDING_BACKEND}", dim=768, max_size=EMBED_OFFLINE_CACHE_SIZE
+                ) if EMBED_OFFLINE_CACHE_SIZE > 0 else None
+                _default_engine = create_engine(cache=cache)
+    return _default_engine
+
+
+# --------- FUNCTION TO GET EMBEDDINGS ---------
+def get_symptom_embedding(text_list):
     """
     text_list: list of symptom strings
     returns: tensor of shape (batch_size, hidden_size)
     """
-    
-    # Tokenize
-    encoded = tokenizer(
-        text_list,
-        padding=True,
-        truncation=True,
-        max_length=64,   # short phrases, so 64 is enough
-        return_tensors="pt"
-    )
-    
-    # Move to GPU
-    encoded = {key: val.to(DEVICE) for key, val in encoded.items()}
-    
-    with torch.no_grad():
-        outputs = model(**encoded)
-    
-    # CLS token embedding (recommended for classification tasks)
-    cls_embeddings = outputs.last_hidden_state[:, 0, :]
-    
-    return cls_embeddings
-
-
-# --------- EXAMPLE ---------
-symptoms = [
-    "Severe chest pain radiating to left arm",
-    "High fever and persistent cough",
-    "Sudden loss of consciousness"
-]
+    return get_default_engine().embed(text_list)
+
+
+if __name__ == "__main__":
+    symptoms = [
+        "Severe chest pain radiating to left arm",
+        "High fever and persistent cough",
+        "Sudden loss of consciousness"
+    ]
 
-embeddings = get_symptom_embedding(symptoms)
+    embeddings = get_symptom_embedding(symptoms)
 
-print("Embedding shape:", embeddings.shape)
+    print("Embedding shape:", embeddings.shape)
@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import RF_N_JOBS, TRAIN_SCORE, XGB_NTHREAD
+from department import train_and_predict_xgb
+from risk_classification import train_random_forest
+
+
+def split_cores(rf_n_jobs=RF_N_JOBS, xgb_nthread=XGB_NTHREAD):
+    """Core budget per trainer; unset (0) budgets share the machine evenly."""
+    cores = os.cpu_count() or 1
+    half = max(cores // 2, 1)
+    return rf_n_jobs or half, xgb_nthread or max(cores - half, 1)
+
+
+def train_models(x_train, y_risk, y_dept, timer, score_train=TRAIN_SCORE):
+    """
+    Train the risk RandomForest and the department XGBoost model concurrently
+    on the same feature matrix. Both release the GIL while fitting, so two
+    threads are enough; each gets its own slice of the cores.
+
+    returns: (risk_model, department_model)
+    """
+    rf_n_jobs, xgb_nthread = split_cores()
+    print(f"Training in parallel: RandomForest n_jobs={rf_n_jobs}, XGBoost nthread={xgb_nthread}")
+
+    def fit_risk():
+        with timer.stage("train risk model"):
+            model, _ = train_random_forest(
+                x_train, y_risk, n_jobs=rf_n_jobs, score_train=score_train
+            )
+        return model
+
+    def fit_department():
+        with timer.stage("train department model"):
+            _, model = train_and_predict_xgb(
+                x_train, y_dept, nthread=xgb_nthread, score_train=score_train
+            )
+        return model
+
+    with timer.stage("train models (parallel)"):
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="train") as pool:
+            risk_future = pool.submit(fit_risk)
+            department_future = pool.submit(fit_department)
+            return risk_future.result(), department_future.result()
@@ -1,112 +1,66 @@
-from to_embeddings import get_symptom_embedding
-from risk_classification import train_random_forest
-from department import train_and_predict_xgb
-from explanation import predict_with_explanation
-import pandas as pd
-import numpy as np
+from feature_store import build_feature_store
+from train_orchestrator import train_models
+from bundle import save_bundle
+from cascade import VitalsCascade, save_cascade
+from config import CASCADE_PATH, MODEL_BUNDLE_DIR
+from explanation import build_explainer, predict_batch_with_explanation
+from features import as_frame
+from sklearn.metrics import accuracy_score
+from profiling import StageTimer
 from sklearn.preprocessing import LabelEncoder
 
-dataset = pd.read_csv("datase.csv")
-testset = pd.read_csv("testdata.csv")
-symptom_texts = dataset["Symptoms"].tolist()
-symptom_embeddings = get_symptom_embedding(symptom_texts).cpu().numpy()
+timer = StageTimer()
 
-# Encode department
-dept_encoder = LabelEncoder()
-dataset["Department"] = dept_encoder.fit_transform(dataset["Department"])
-testset["Department"] = dept_encoder.transform(testset["Department"])
-
-
-
-pre_encoder = LabelEncoder()
-
-dataset["Pre-Existing_Conditions"] = pre_encoder.fit_transform(
-    dataset["Pre-Existing_Conditions"]
-)
-
-testset["Pre-Existing_Conditions"] = pre_encoder.transform(
-    testset["Pre-Existing_Conditions"]
-)
-
-
-
-
-
-# Generate embeddings
-symptom_embeddings = get_symptom_embedding(
-    dataset["Symptoms"].tolist()
-).cpu().numpy()
+# Each CSV is streamed in chunks into an on-disk float32 feature store
+# (reused on reruns), so memory stays bounded by FEATURE_CHUNK_ROWS
+with timer.stage("featurize train"):
+    train_store = build_feature_store("datase.csv")
 
-# Convert to DataFrame
-embedding_df = pd.DataFrame(
-    symptom_embeddings,
-    columns=[f"emb_{i}" for i in range(symptom_embeddings.shape[1])]
-)
+with timer.stage("featurize test"):
+    test_store = build_feature_store("testdata.csv")
 
-# Drop original Symptoms column
-dataset = dataset.drop(columns=["Symptoms"])
-
-# Split dataset into:
-# first 6 columns + rest
-first_part = dataset.iloc[:, :6]
-second_part = dataset.iloc[:, 6:]
-
-# Insert embeddings after 6th column
-dataset = pd.concat(
-    [first_part, embedding_df, second_part],
-    axis=1
-)
-
-sym = testset["Symptoms"].tolist()
-symptom_embeddings = get_symptom_embedding(sym).cpu().numpy()
-# Generate embeddings
-symptom_embeddings = get_symptom_embedding(
-    testset["Symptoms"].tolist()
-).cpu().numpy()
-
-# Convert to DataFrame
-embedding_df = pd.DataFrame(
-    symptom_embeddings,
-    columns=[f"emb_{i}" for i in range(symptom_embeddings.shape[1])]
-)
-
-# Drop original Symptoms column
-testset = testset.drop(columns=["Symptoms"])
-
-# Split dataset into:
-# first 6 columns + rest
-first_part = testset.iloc[:, :6]
-second_part = testset.iloc[:, 6:]
-
-# Insert embeddings after 6th column
-testset = pd.concat(
-    [first_part, embedding_df, second_part],
-    axis=1
-)
-
-# Features
-x_train = dataset.drop(columns=["Risk_Level", "Department"])
-y_train = dataset["Risk_Level"]
-y_train2 = dataset["Department"]
+# Memory-mapped, column-named views in the exact layout the service uses
+x_train = as_frame(train_store.X)
+xtest = as_frame(test_store.X)
 
+# Encode department
+dept_encoder = LabelEncoder()
+dept_train = dept_encoder.fit_transform(train_store.labels["Department"])
+dept_test = dept_encoder.transform(test_store.labels["Department"])
 
-xtest = testset.drop(columns=["Risk_Level", "Department"])
-y_test = testset["Risk_Level"]
-y_test2 = testset["Department"]
-# Train department 
+# Labels
+y_train = train_store.labels["Risk_Level"]
+y_train2 = dept_train
 
-model,pred = train_random_forest(x_train, y_train)
 
-model2, pred2 = train_and_predict_xgb(x_train, y_train2)
+y_test = test_store.labels["Risk_Level"]
+y_test2 = dept_test
+# Train department
 
+# Both models share the feature matrix and train side by side
+model, model2 = train_models(x_train, y_train, y_train2, timer)
 
-feature_names = x_train.columns[:6].tolist()
+with timer.stage("save bundle"):
+    manifest = save_bundle(MODEL_BUNDLE_DIR, model, model2, dept_encoder.classes_)
+    print(f"Saved model bundle {manifest['version']} to {MODEL_BUNDLE_DIR}")
 
+# Vitals-only first stage the service can put in front of the models (CASCADE_CONFIDENCE)
+with timer.stage("fit cascade"):
+    cascade = VitalsCascade.fit("datase.csv")
+    save_cascade(cascade, CASCADE_PATH)
+    print(f"Saved rule cascade {cascade.version} to {CASCADE_PATH}")
 
 
-risk,accur,ris_expl = predict_with_explanation(model, xtest.values, y_test  , feature_names)
+# Score the test set the way the service does: one vectorized prediction and
+# the serving explainer per model, so the stage times what /predict_batch pays
+with timer.stage("evaluate"):
+    risk, ris_expl = predict_batch_with_explanation(model, xtest, explainer=build_explainer(model))
+    accur = accuracy_score(y_test, risk)
 
-dept,accur2,dept_expl = predict_with_explanation(model2, xtest.values, y_test2, feature_names)
+    dept, dept_expl = predict_batch_with_explanation(model2, xtest, explainer=build_explainer(model2))
+    accur2 = accuracy_score(y_test2, dept)
 
 print(f"Risk Prediction:, Accuracy: {accur}")
-print(f"Department Prediction:, Accuracy: {accur2}")
\ No newline at end of file
+print(f"Department Prediction:, Accuracy: {accur2}")
+
+timer.report()
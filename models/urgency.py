@@ -0,0 +1,54 @@
+from config import PRIORITY_AGING_S
+
+
+# Urgency levels, most urgent first
+LEVELS = ("high", "medium", "low")
+_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+
+
+def urgency_points(user_data):
+    """
+    Vitals pre-score after the point rules that labelled the training data
+    (dataset_generation/dataset.py risk()). Stroke history (+3 there) is not
+    part of the payload, so the acute findings take its weight instead:
+    tachycardia and hypertension score 3, age over 60 and a pre-existing
+    condition 2, for at most 10 points.
+    user_data: dict with the training column names (see to_user_data_dict)
+    """
+    points = 0
+    if user_data["Age"] > 60:
+        points += 2
+    if user_data["Blood_Pressure"] > 150:
+        points += 3
+    if user_data["Heart_Rate"] > 110:
+        points += 3
+    if str(user_data["Pre-Existing_Conditions"]).strip() not in ("", "None"):
+        points += 2
+    return points
+
+
+def urgency_level(user_data):
+    """
+    "high", "medium" or "low". The cut-offs sit at roughly the same share of the
+    maximum as the dataset's 7 and 4 of 11: both acute findings (or one with
+    both chronic ones) are high, any acute finding or both chronic ones medium.
+    """
+    points = urgency_points(user_data)
+    if points >= 6:
+        return "high"
+    if points >= 3:
+        return "medium"
+    return "low"
+
+
+def most_urgent(levels):
+    return min(levels, key=_RANK.__getitem__, default=LEVELS[-1])
+
+
+def schedule_key(level, enqueued, aging=PRIORITY_AGING_S):
+    """
+    Sort key for queued work: smaller runs first.
+    Each level below the top delays a job by `aging` seconds, which is the same
+    as moving it up one level for every `aging` seconds it waits.
+    """
+    return _RANK[level] * aging + enqueued